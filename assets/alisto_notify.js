@@ -0,0 +1,16 @@
+// Client-side handler for notifications dispatched by project_alisto.notifications.
+// Called by the notification listener component with the `notification` state
+// var each time its sequence number increases after the page has hydrated.
+
+window.alistoNotify = function (payload) {
+  if (!("Notification" in window) || Notification.permission !== "granted") {
+    return;
+  }
+  // A shared tag makes each batch replace the previous toast instead of stacking
+  new Notification(payload.title, {
+    body: payload.body,
+    icon: "/favicon.ico",
+    tag: "alisto-alerts",
+    renotify: true,
+  });
+};
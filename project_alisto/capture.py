@@ -0,0 +1,254 @@
+"""Record and replay raw MQTT traffic for Project Alisto.
+
+Capture files start with an 8-byte magic header followed by records of:
+receive time (float64), topic length (uint16), payload length (uint32),
+topic bytes and payload bytes, all little-endian.
+
+Records are buffered in memory and appended with a single write() per
+flush (every MQTT_CAPTURE_FLUSH_RECORDS records or
+MQTT_CAPTURE_FLUSH_SECONDS seconds), so a killed process loses at most
+one flush interval and the file only ever holds whole records. Every
+process records to its own file (see capture_path).
+
+Usage:
+    python -m project_alisto.capture info capture.bin
+    python -m project_alisto.capture replay capture.bin --speed 10
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional
+
+from project_alisto.config import (
+    MQTT_CAPTURE_FLUSH_RECORDS,
+    MQTT_CAPTURE_FLUSH_SECONDS,
+    MQTT_CAPTURE_PATH,
+    MQTT_CLIENT_ID,
+)
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"ALSTCAP1"
+RECORD_HEADER = struct.Struct("<dHI")
+
+
+class CaptureRecord(NamedTuple):
+    """A single captured MQTT message."""
+    received_at: float  # Unix timestamp
+    topic: str
+    payload: bytes
+
+
+def capture_path(path: str, pid: Optional[int] = None) -> str:
+    """Get the per-process capture file for a configured path ("capture.bin" -> "capture-<pid>.bin")."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{os.getpid() if pid is None else pid}{ext}"
+
+
+class CaptureWriter:
+    """Thread-safe appender of raw MQTT messages to a capture file."""
+
+    def __init__(
+            self,
+            path: str,
+            flush_records: int = MQTT_CAPTURE_FLUSH_RECORDS,
+            flush_seconds: float = MQTT_CAPTURE_FLUSH_SECONDS,
+    ):
+        """
+        Open (or continue) a capture file.
+
+        Args:
+            path: Capture file to append to
+            flush_records: Write out buffered records once this many are pending
+            flush_seconds: Write out buffered records at least this often (0 disables the timer)
+        """
+        self.path = path
+        self.flush_records = flush_records
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._pending_count = 0
+        # Unbuffered: every flush is exactly one write() of whole records
+        self._file: Optional[BinaryIO] = open(path, "ab", buffering=0)
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+        self._stop = threading.Event()
+        if flush_seconds > 0:
+            threading.Thread(
+                target=self._run, args=(flush_seconds,), name="alisto-capture", daemon=True
+            ).start()
+
+    def record(self, topic: str, payload: bytes, received_at: Optional[float] = None):
+        """Buffer one message, writing the buffer out once flush_records are pending."""
+        topic_bytes = topic.encode("utf-8")
+        header = RECORD_HEADER.pack(
+            time.time() if received_at is None else received_at,
+            len(topic_bytes),
+            len(payload),
+        )
+        with self._lock:
+            if self._file is None:
+                return
+            self._pending += header + topic_bytes + payload
+            self._pending_count += 1
+            if self._pending_count >= self.flush_records:
+                self._write_pending()
+
+    def _write_pending(self):
+        """Append buffered records with a single write (lock held)."""
+        if self._pending:
+            self._file.write(bytes(self._pending))
+            self._pending.clear()
+            self._pending_count = 0
+
+    def _run(self, flush_seconds: float):
+        while not self._stop.wait(flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._write_pending()
+
+    def close(self):
+        """Flush and close the capture file."""
+        self._stop.set()
+        with self._lock:
+            if self._file is not None:
+                self._write_pending()
+                self._file.close()
+                self._file = None
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """Iterate over the records of a capture file."""
+    with open(path, "rb") as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not an Alisto capture file")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            received_at, topic_len, payload_len = RECORD_HEADER.unpack(header)
+            body = f.read(topic_len + payload_len)
+            if len(body) < topic_len + payload_len:
+                logger.warning(f"Truncated record at end of {path}")
+                return
+            yield CaptureRecord(
+                received_at=received_at,
+                topic=body[:topic_len].decode("utf-8"),
+                payload=body[topic_len:],
+            )
+
+
+def replay(
+        path: str,
+        sink: Callable[[str, bytes], None],
+        speed: Optional[float] = 1.0,
+) -> int:
+    """
+    Feed a capture file into a sink, preserving the original pacing.
+
+    Args:
+        path: Capture file to read
+        sink: Callable receiving (topic, payload_bytes), e.g. MQTTClient.dispatch_raw
+        speed: Playback speed multiplier; None or 0 replays as fast as possible
+
+    Returns:
+        Number of records replayed
+    """
+    count = 0
+    first_received_at = None
+    started = time.monotonic()
+    for record in read_capture(path):
+        if speed:
+            if first_received_at is None:
+                first_received_at = record.received_at
+            delay = (record.received_at - first_received_at) / speed - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        sink(record.topic, record.payload)
+        count += 1
+    return count
+
+
+_recorder: Optional[CaptureWriter] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[CaptureWriter]:
+    """Get the process-wide recorder, if MQTT_CAPTURE_PATH is configured."""
+    global _recorder
+    if not MQTT_CAPTURE_PATH:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = CaptureWriter(capture_path(MQTT_CAPTURE_PATH))
+            atexit.register(_recorder.close)
+            logger.info(f"Recording MQTT traffic to {_recorder.path}")
+        return _recorder
+
+
+def _info(args: argparse.Namespace) -> int:
+    """Print a summary of a capture file."""
+    count = 0
+    first = last = None
+    topics = {}
+    for record in read_capture(args.path):
+        count += 1
+        first = record.received_at if first is None else first
+        last = record.received_at
+        topics[record.topic] = topics.get(record.topic, 0) + 1
+    duration = (last - first) if count else 0.0
+    print(f"{args.path}: {count} messages over {duration:.1f}s, {len(topics)} topics")
+    for topic, topic_count in sorted(topics.items()):
+        print(f"  {topic}: {topic_count}")
+    return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    """Republish a capture file to the configured MQTT broker."""
+    from project_alisto.mqtt_client import MQTTClient
+
+    client = MQTTClient(client_id=f"{MQTT_CLIENT_ID}-replay")
+    if not client.connect():
+        return 1
+    speed = None if args.max_speed else args.speed
+    try:
+        started = time.monotonic()
+        count = replay(args.path, client.publish_raw, speed=speed)
+        elapsed = time.monotonic() - started
+        print(f"Replayed {count} messages in {elapsed:.1f}s")
+    finally:
+        client.disconnect()
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Inspect and replay Alisto MQTT captures.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = subparsers.add_parser("info", help="Summarize a capture file")
+    info_parser.add_argument("path")
+    info_parser.set_defaults(func=_info)
+
+    replay_parser = subparsers.add_parser("replay", help="Republish a capture file to the broker")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    replay_parser.add_argument("--max-speed", action="store_true", help="Replay without pacing")
+    replay_parser.set_defaults(func=_replay)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
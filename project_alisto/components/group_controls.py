@@ -0,0 +1,60 @@
+"""Group control component for bulk switching socket groups."""
+
+import reflex as rx
+from project_alisto.project_alisto import State
+
+
+def group_row(group) -> rx.Component:
+    """Display one group with its bulk on/off buttons."""
+    return rx.hstack(
+        rx.text(group["name"], size="3", weight="bold"),
+        rx.badge(f"{group['size']} socket(s)", color_scheme="blue"),
+        rx.spacer(),
+        rx.button(
+            "Shed (Off)",
+            on_click=State.run_group_command(group["id"], "off"),
+            disabled=State.group_command["running"].to(bool),
+            color_scheme="red",
+            variant="outline",
+            size="2",
+        ),
+        rx.button(
+            "Restore (On)",
+            on_click=State.run_group_command(group["id"], "on"),
+            disabled=State.group_command["running"].to(bool),
+            color_scheme="green",
+            variant="outline",
+            size="2",
+        ),
+        spacing="3",
+        align="center",
+        width="100%",
+    )
+
+
+def group_controls() -> rx.Component:
+    """Display socket groups and the progress of the last bulk command."""
+    return rx.cond(
+        State.socket_groups.length() > 0,
+        rx.card(
+            rx.vstack(
+                rx.heading("Group Control", size="5"),
+                rx.foreach(State.socket_groups, group_row),
+                rx.cond(
+                    State.group_command.contains("total"),
+                    rx.text(
+                        f"{State.group_command['group']} {State.group_command['command']}: "
+                        f"{State.group_command['sent']}/{State.group_command['total']} sent, "
+                        f"{State.group_command['skipped']} skipped, "
+                        f"{State.group_command['failed']} failed",
+                        size="2",
+                        color="gray",
+                    ),
+                ),
+                spacing="3",
+                width="100%",
+            ),
+            width="100%",
+            padding="4",
+        ),
+    )
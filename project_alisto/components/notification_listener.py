@@ -0,0 +1,46 @@
+"""Invisible component that shows browser notifications from state."""
+
+import reflex as rx
+from reflex.vars.base import Var, VarData
+
+from project_alisto.notifications import CLIENT_HANDLER
+from project_alisto.project_alisto import State
+
+
+class NotificationListener(rx.Fragment):
+    """
+    Calls the preinstalled client handler whenever State.notification gets a new sequence number.
+
+    The sequence number present once the page has hydrated is remembered and
+    never shown: it is the session's last alert re-sent on reload, not a new
+    one. Comparing sequence numbers keeps this independent of the clocks of
+    the server and the browser.
+    """
+
+    def add_imports(self) -> dict:
+        return {"react": [rx.ImportVar(tag="useEffect"), rx.ImportVar(tag="useRef")]}
+
+    def add_hooks(self) -> list:
+        notification = State.notification
+        hydrated = State.is_hydrated
+        payload = notification._js_expr
+        seq = f"({payload}?.seq ?? 0)"
+        return [
+            "const alistoSeenSeq = useRef(null)",
+            Var(
+                _js_expr=(
+                    f"useEffect(() => {{ "
+                    f"if (!{hydrated._js_expr}) {{ return; }} "
+                    f"if (alistoSeenSeq.current === null) {{ alistoSeenSeq.current = {seq}; return; }} "
+                    f"if ({seq} > alistoSeenSeq.current) {{ "
+                    f"alistoSeenSeq.current = {seq}; {CLIENT_HANDLER}({payload}); }} "
+                    f"}}, [{hydrated._js_expr}, {payload}?.seq])"
+                ),
+                _var_data=VarData.merge(notification._get_all_var_data(), hydrated._get_all_var_data()),
+            ),
+        ]
+
+
+def notification_listener() -> rx.Component:
+    """Render nothing; deliver notifications to the browser."""
+    return NotificationListener.create()
@@ -21,33 +21,7 @@ def socket_card(socket_id: int) -> rx.Component:
                             "Off"
                         )
                     ),
-                    color_scheme=rx.cond(
-                        State.sockets[socket_id].is_cooling,
-                        "orange",
-                        rx.cond(
-                            State.sockets[socket_id].is_on,
-                            rx.cond(
-                                # Check temperature thresholds
-                                State.sockets[socket_id].temperature >= State.thermal_limits.max_temperature * 0.9,
-                                "red",
-                                rx.cond(
-                                    State.sockets[socket_id].temperature >= State.thermal_limits.max_temperature * 0.7,
-                                    "yellow",
-                                    rx.cond(
-                                        # Check current thresholds
-                                        State.sockets[socket_id].current >= State.thermal_limits.max_current * 0.9,
-                                        "red",
-                                        rx.cond(
-                                            State.sockets[socket_id].current >= State.thermal_limits.max_current * 0.7,
-                                            "yellow",
-                                            "green"
-                                        )
-                                    )
-                                )
-                            ),
-                            "gray"
-                        )
-                    )
+                    color_scheme=State.sockets[socket_id].status_color,
                 ),
                 justify="between",
                 width="100%",
@@ -62,7 +36,7 @@ def socket_card(socket_id: int) -> rx.Component:
                         size="8"
                     ),
                     rx.text(
-                        f"/ {State.thermal_limits.max_temperature:.0f}°C",
+                        f"/ {State.socket_limits[socket_id].max_temperature:.0f}°C",
                         size="3",
                         color="gray"
                     ),
@@ -81,7 +55,7 @@ def socket_card(socket_id: int) -> rx.Component:
                         size="8"
                     ),
                     rx.text(
-                        f"/ {State.thermal_limits.max_current:.0f}A",
+                        f"/ {State.socket_limits[socket_id].max_current:.0f}A",
                         size="3",
                         color="gray"
                     ),
@@ -137,6 +111,15 @@ def socket_card(socket_id: int) -> rx.Component:
                     variant="outline",
                     size="3",
                 ),
+                rx.link(
+                    rx.button(
+                        rx.icon("chart_line", size=16),
+                        "Trend",
+                        variant="soft",
+                        size="3",
+                    ),
+                    href=f"/socket/{socket_id}",
+                ),
                 spacing="3",
                 width="100%",
             ),
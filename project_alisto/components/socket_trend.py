@@ -0,0 +1,73 @@
+"""Live trend chart component for a single socket."""
+
+import reflex as rx
+from project_alisto.project_alisto import State
+
+
+def socket_trend() -> rx.Component:
+    """Display a socket's temperature and current trend."""
+    return rx.vstack(
+        # Header
+        rx.hstack(
+            rx.link(
+                rx.button(
+                    rx.icon("arrow_left", size=16),
+                    "Dashboard",
+                    variant="soft",
+                    size="2",
+                ),
+                href="/",
+            ),
+            rx.heading(f"Socket {State.socket_id} Trend", size="8"),
+            spacing="4",
+            align="center",
+        ),
+
+        # Trend chart
+        rx.card(
+            rx.cond(
+                State.trend_points.length() > 0,
+                rx.recharts.line_chart(
+                    rx.recharts.line(
+                        data_key="temperature",
+                        name="Temperature (°C)",
+                        y_axis_id="left",
+                        stroke="var(--orange-9)",
+                        dot=False,
+                        is_animation_active=False,
+                    ),
+                    rx.recharts.line(
+                        data_key="current",
+                        name="Current (A)",
+                        y_axis_id="right",
+                        stroke="var(--blue-9)",
+                        dot=False,
+                        is_animation_active=False,
+                    ),
+                    rx.recharts.x_axis(data_key="time"),
+                    rx.recharts.y_axis(y_axis_id="left"),
+                    rx.recharts.y_axis(y_axis_id="right", orientation="right"),
+                    rx.recharts.cartesian_grid(stroke_dasharray="3 3"),
+                    rx.recharts.graphing_tooltip(),
+                    rx.recharts.legend(),
+                    data=State.trend_points,
+                    width="100%",
+                    height=360,
+                ),
+                rx.text(
+                    "No readings recorded yet",
+                    size="3",
+                    color="gray",
+                    text_align="center",
+                    width="100%",
+                ),
+            ),
+            width="100%",
+            padding="4",
+        ),
+
+        spacing="6",
+        width="100%",
+        padding="6",
+        max_width="1400px",
+    )
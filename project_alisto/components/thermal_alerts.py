@@ -62,9 +62,19 @@ def thermal_alerts() -> rx.Component:
                                 align="start",
                                 spacing="1",
                             ),
-                            rx.badge(
-                                f"Socket {event.socket_id}",
-                                color_scheme="blue"
+                            rx.hstack(
+                                rx.cond(
+                                    event.repeat_count > 1,
+                                    rx.badge(
+                                        f"x{event.repeat_count}",
+                                        color_scheme="orange"
+                                    ),
+                                ),
+                                rx.badge(
+                                    f"Socket {event.socket_id}",
+                                    color_scheme="blue"
+                                ),
+                                spacing="2",
                             ),
                             justify="between",
                             width="100%",
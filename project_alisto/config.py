@@ -12,19 +12,86 @@ MQTT_BROKER_PORT = int(os.getenv("MQTT_BROKER_PORT", "1883"))
 MQTT_USERNAME = os.getenv("MQTT_USERNAME", None)
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD", None)
 MQTT_CLIENT_ID = os.getenv("MQTT_CLIENT_ID", "alisto-app")
+# Longest wait between attempts while the ingest worker retries its first connection
+MQTT_CONNECT_RETRY_MAX_SECONDS = float(os.getenv("MQTT_CONNECT_RETRY_MAX_SECONDS", "30"))
+
+# Optional file to record raw MQTT traffic to (see project_alisto.capture).
+# Each process writes its own file, with its PID added before the extension.
+MQTT_CAPTURE_PATH = os.getenv("MQTT_CAPTURE_PATH", None)
+# Buffered capture records are written out after this many records or seconds
+MQTT_CAPTURE_FLUSH_RECORDS = int(os.getenv("MQTT_CAPTURE_FLUSH_RECORDS", "100"))
+MQTT_CAPTURE_FLUSH_SECONDS = float(os.getenv("MQTT_CAPTURE_FLUSH_SECONDS", "1"))
 
 # MQTT Topic Patterns
 MQTT_TOPIC_SOCKET_DATA = "alisto/socket/{socket_id}/data"
 MQTT_TOPIC_SOCKET_STATUS = "alisto/socket/{socket_id}/status"
 MQTT_TOPIC_SOCKET_CONTROL = "alisto/socket/{socket_id}/control"
+MQTT_TOPIC_ALL_SOCKET_DATA = "alisto/socket/+/data"
+MQTT_TOPIC_ALL_SOCKET_STATUS = "alisto/socket/+/status"
 
-# Thermal Limits (for UI display/reference only)
+# Default thermal limits (per-socket and per-group profiles override them)
 DEFAULT_MAX_TEMPERATURE = 60.0  # Celsius
 DEFAULT_MAX_CURRENT = 15.0  # Amperes
 
+# How far (as a fraction of a limit) a socket's load must fall below a status
+# threshold before its status color drops back a level
+THERMAL_HYSTERESIS_RATIO = float(os.getenv("THERMAL_HYSTERESIS_RATIO", "0.05"))
+
 # Cooling Period (for UI countdown display)
 COOLING_PERIOD_MINUTES = 5
 
+# Group control: publish rate shared by all bulk commands, and the minimum
+# spacing between turn-ons within one command (limits inrush current)
+GROUP_COMMAND_RATE = float(os.getenv("GROUP_COMMAND_RATE", "10"))  # commands per second
+GROUP_TURN_ON_STAGGER_SECONDS = float(os.getenv("GROUP_TURN_ON_STAGGER_SECONDS", "0.5"))
+
+# Thermal event logging: repeats of the same event within the window are
+# collapsed into one row, and rows are written in batches every flush interval
+THERMAL_EVENT_DEDUP_SECONDS = float(os.getenv("THERMAL_EVENT_DEDUP_SECONDS", "60"))
+THERMAL_EVENT_FLUSH_SECONDS = float(os.getenv("THERMAL_EVENT_FLUSH_SECONDS", "1"))
+
 # Number of sockets
-NUM_SOCKETS = 4
+NUM_SOCKETS = int(os.getenv("NUM_SOCKETS", "4"))
+
+# Dashboard last-known-state cache: how often it reads new state from the
+# store, and whether to also seed it from retained MQTT messages at startup
+LIVE_STATE_REFRESH_SECONDS = float(os.getenv("LIVE_STATE_REFRESH_SECONDS", "1"))
+LIVE_STATE_SEED_RETAINED = os.getenv("LIVE_STATE_SEED_RETAINED", "false").lower() == "true"
+
+# Socket trend chart: history window loaded on open, and points kept per chart
+TREND_WINDOW_MINUTES = int(os.getenv("TREND_WINDOW_MINUTES", "30"))
+TREND_POINTS = int(os.getenv("TREND_POINTS", "120"))
+# Width of one chart point; history and live readings are averaged into these buckets
+TREND_BUCKET_SECONDS = TREND_WINDOW_MINUTES * 60 / TREND_POINTS
+
+# Browser notifications: alerts are batched per window, one toast per interval at most
+NOTIFICATION_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_WINDOW_SECONDS", "3"))
+NOTIFICATION_MIN_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_MIN_INTERVAL_SECONDS", "10"))
+
+# Port for the ingest worker's /metrics endpoint (0 disables it)
+INGEST_METRICS_PORT = int(os.getenv("INGEST_METRICS_PORT", "0"))
+
+# Ingest batching: history rows and state changes are written in one transaction
+# per this many messages or this many seconds after a batch's first message
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_BATCH_SECONDS = float(os.getenv("INGEST_BATCH_SECONDS", "0.25"))
+
+# Ingest sharding: this worker owns sockets where socket_id % count == index
+INGEST_SHARD_COUNT = int(os.getenv("INGEST_SHARD_COUNT", "1"))
+INGEST_SHARD_INDEX = int(os.getenv("INGEST_SHARD_INDEX", "0"))
+
+
+# Dashboard event-loop watchdog: log the blocking stack when the loop stalls
+# longer than this (0 disables)
+LOOP_LAG_THRESHOLD_SECONDS = float(os.getenv("LOOP_LAG_THRESHOLD_SECONDS", "0.25"))
+
+# On-demand profiling windows (SIGUSR1, worker --profile, POST /admin/profile on
+# the dashboard, POST /profile on the worker's metrics port); HTTP requests may
+# ask for at most PROFILE_MAX_WINDOW_SECONDS
+PROFILE_WINDOW_SECONDS = float(os.getenv("PROFILE_WINDOW_SECONDS", "30"))
+PROFILE_MAX_WINDOW_SECONDS = float(os.getenv("PROFILE_MAX_WINDOW_SECONDS", "600"))
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.01"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", ".")
 
+# Bearer token for the admin endpoints of the dashboard and worker (unset disables them)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", None)
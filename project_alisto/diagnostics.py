@@ -0,0 +1,271 @@
+"""Event-loop lag watchdog and on-demand profiling for Project Alisto.
+
+The watchdog runs a heartbeat task on the dashboard's event loop and a
+thread that watches it. When the heartbeat stalls past
+LOOP_LAG_THRESHOLD_SECONDS, the thread logs the loop thread's current
+stack, i.e. the synchronous code that is blocking the loop, once per stall.
+
+A profiling window samples the call stacks of every thread and times the
+handlers decorated with @profiled for PROFILE_WINDOW_SECONDS, then writes
+a JSON report to PROFILE_DIR. Outside a window the decorator costs one
+attribute check per call. Windows are started with SIGUSR1 (dashboard and
+worker; a worker started with --shards forwards it to every shard), the
+worker's --profile option, or, when ADMIN_TOKEN is set, POST /admin/profile
+on the dashboard or POST /profile on the worker's metrics port. The ingest
+handlers run in the worker, so only a worker profile has handler timings.
+"""
+
+import asyncio
+import functools
+import hmac
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from project_alisto.config import (
+    ADMIN_TOKEN,
+    LOOP_LAG_THRESHOLD_SECONDS,
+    PROFILE_DIR,
+    PROFILE_MAX_WINDOW_SECONDS,
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+    PROFILE_WINDOW_SECONDS,
+)
+from project_alisto.metrics import EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+# Deepest stack kept per sample
+MAX_STACK_DEPTH = 64
+
+
+class LoopLagWatchdog:
+    """Logs the stack of whatever blocks an asyncio event loop past a threshold."""
+
+    def __init__(self, threshold_seconds: float = LOOP_LAG_THRESHOLD_SECONDS, interval_seconds: float = 0.1):
+        self.threshold_seconds = threshold_seconds
+        self.interval_seconds = interval_seconds
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+
+    async def run(self):
+        """Heartbeat on the running loop until cancelled, with a watcher thread alongside."""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        threading.Thread(target=self._watch, name="alisto-loop-watchdog", daemon=True).start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval_seconds
+                await asyncio.sleep(self.interval_seconds)
+                now = time.monotonic()
+                EVENT_LOOP_LAG.observe(max(now - expected, 0.0))
+                self._beat = now
+        finally:
+            self._stop.set()
+
+    def check(self, now: Optional[float] = None) -> Optional[float]:
+        """Get how long the loop has been blocked, or None if within the threshold."""
+        now = time.monotonic() if now is None else now
+        blocked = now - self._beat - self.interval_seconds
+        return blocked if blocked > self.threshold_seconds else None
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.interval_seconds):
+            beat = self._beat
+            blocked = self.check()
+            if blocked is None or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(unavailable)\n"
+            logger.warning(f"Event loop blocked for {blocked:.3f}s, loop thread stack:\n{stack}")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = "/".join(code.co_filename.replace("\\", "/").rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, thread_name: str = "") -> str:
+    """Format a frame's stack as one collapsed line ("root;...;leaf"), outermost first."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if thread_name:
+        labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class HandlerProfiler:
+    """Samples thread stacks and times profiled handlers during a profiling window."""
+
+    def __init__(self, sample_interval_seconds: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.sample_interval_seconds = sample_interval_seconds
+        self.active = False
+        self._stacks: Counter = Counter()
+        self._timings: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[datetime] = None
+        self._output_dir = PROFILE_DIR
+        self.last_report: Optional[str] = None
+
+    def record(self, handler: str, seconds: float):
+        """Record one handler call (only while active)."""
+        with self._lock:
+            if self.active:
+                self._timings.setdefault(handler, []).append(seconds)
+
+    def start(self, seconds: float = PROFILE_WINDOW_SECONDS, output_dir: str = PROFILE_DIR) -> bool:
+        """Start a profiling window; returns False if one is already running."""
+        if not (math.isfinite(seconds) and seconds > 0):
+            raise ValueError(f"Profiling window must be a positive number of seconds, got {seconds}")
+        with self._lock:
+            if self.active:
+                return False
+            self._stacks = Counter()
+            self._timings = {}
+            self._started_at = datetime.now()
+            self._output_dir = output_dir
+            self._stop.clear()
+            self.active = True
+        logger.info(f"Profiling for {seconds:.0f}s")
+        self._thread = threading.Thread(target=self._sample, args=(seconds,), name="alisto-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> Optional[str]:
+        """End the running window early; returns the report path once written."""
+        thread = self._thread
+        if thread is None:
+            return None
+        self._stop.set()
+        thread.join()
+        return self.last_report
+
+    def _sample(self, seconds: float):
+        own = threading.get_ident()
+        names = {}
+        started = time.monotonic()
+        deadline = started + seconds
+        while time.monotonic() < deadline and not self._stop.wait(self.sample_interval_seconds):
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            samples = [
+                collapse_stack(frame, names.get(ident, str(ident)))
+                for ident, frame in frames.items() if ident != own
+            ]
+            del frames
+            self._stacks.update(samples)
+        with self._lock:
+            self.active = False
+        try:
+            self.last_report = self._write(time.monotonic() - started)
+            logger.info(f"Wrote profile to {self.last_report}")
+        except OSError as e:
+            logger.error(f"Failed to write profile: {e}")
+
+    def report(self, duration_seconds: float) -> dict:
+        """Build the report of the last window."""
+        handlers = {}
+        for handler, timings in sorted(self._timings.items()):
+            ordered = sorted(timings)
+            handlers[handler] = {
+                "count": len(ordered),
+                "total_seconds": sum(ordered),
+                "mean_seconds": sum(ordered) / len(ordered),
+                "p95_seconds": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+                "max_seconds": ordered[-1],
+            }
+        return {
+            "started_at": self._started_at.isoformat() if self._started_at else None,
+            "duration_seconds": round(duration_seconds, 3),
+            "sample_interval_seconds": self.sample_interval_seconds,
+            "samples": sum(self._stacks.values()),
+            "handlers": handlers,
+            # Collapsed stacks (flamegraph input), most frequent first
+            "stacks": dict(self._stacks.most_common()),
+        }
+
+    def _write(self, duration_seconds: float) -> str:
+        os.makedirs(self._output_dir, exist_ok=True)
+        path = os.path.join(
+            self._output_dir, f"alisto-profile-{os.getpid()}-{self._started_at:%Y%m%d-%H%M%S}.json"
+        )
+        with open(path, "w") as f:
+            json.dump(self.report(duration_seconds), f, indent=1)
+        return path
+
+
+PROFILER = HandlerProfiler()
+
+
+def profiled(handler: str) -> Callable:
+    """Decorator timing a function into PROFILER while a profiling window is open."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.active:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(handler, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def profile_request(authorization: str, query: Mapping[str, str]) -> Tuple[int, dict]:
+    """
+    Handle an HTTP request to start a profiling window in this process.
+
+    Args:
+        authorization: The Authorization header ("Bearer <ADMIN_TOKEN>")
+        query: Query parameters; "seconds" is the window length
+
+    Returns:
+        HTTP status code and JSON body
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(authorization, f"Bearer {ADMIN_TOKEN}"):
+        return 403, {"error": "Forbidden"}
+    try:
+        seconds = float(query.get("seconds", PROFILE_WINDOW_SECONDS))
+    except ValueError as e:
+        return 400, {"error": f"Bad query parameter: {e}"}
+    if not (math.isfinite(seconds) and 0 < seconds <= PROFILE_MAX_WINDOW_SECONDS):
+        return 400, {"error": f"seconds must be greater than 0 and at most {PROFILE_MAX_WINDOW_SECONDS:g}"}
+    if not PROFILER.start(seconds):
+        return 409, {"started": False, "reason": "A profiling window is already running"}
+    return 202, {"started": True, "seconds": seconds, "pid": os.getpid()}
+
+
+def install_profile_signal():
+    """Start a profiling window on SIGUSR1 (where the platform has it)."""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: PROFILER.start())
+
+
+async def start_loop_watchdog():
+    """Lifespan task: watch the backend's event loop and accept SIGUSR1 profiling requests."""
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, PROFILER.start)
+    except (AttributeError, NotImplementedError, RuntimeError):
+        pass
+    if LOOP_LAG_THRESHOLD_SECONDS > 0:
+        await LoopLagWatchdog().run()
@@ -0,0 +1,175 @@
+"""Debounced, batched thermal event logging for the ingest pipeline.
+
+Firmware can resend the same THERMAL_SHUTDOWN many times for one cooling
+period. Repeats of (socket_id, event_type, cooling_until) seen within the
+dedup window are collapsed into a single ThermalEvent row whose
+repeat_count is kept up to date, and rows are written in batches from a
+background thread.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import reflex as rx
+import sqlalchemy
+
+from project_alisto.config import THERMAL_EVENT_DEDUP_SECONDS, THERMAL_EVENT_FLUSH_SECONDS
+from project_alisto.metrics import DB_COMMIT_LATENCY, THERMAL_EVENTS
+from project_alisto.models import ThermalEvent
+
+logger = logging.getLogger(__name__)
+
+EventKey = Tuple[int, str, Optional[float]]
+
+
+@dataclass
+class PendingEvent:
+    """A collapsed event and its write state."""
+    socket_id: int
+    event_type: str
+    message: str
+    cooling_until: Optional[float]
+    timestamp: datetime
+    last_seen: float
+    repeat_count: int = 1
+    row_id: Optional[int] = None  # Set once the row has been inserted
+    dirty: bool = True  # Needs an insert or a repeat_count update
+
+
+class EventDeduplicator:
+    """Collapses repeated events within a window (no I/O)."""
+
+    def __init__(self, window_seconds: float = THERMAL_EVENT_DEDUP_SECONDS):
+        self.window_seconds = window_seconds
+        self._events: Dict[EventKey, PendingEvent] = {}
+
+    def record(
+            self,
+            socket_id: int,
+            event_type: str,
+            message: str = "",
+            cooling_until: Optional[float] = None,
+            now: Optional[float] = None,
+    ) -> bool:
+        """Record an event; returns False if it was collapsed into a recent one."""
+        now = time.monotonic() if now is None else now
+        key = (socket_id, event_type, cooling_until)
+        event = self._events.get(key)
+        if event is not None and now - event.last_seen <= self.window_seconds:
+            event.repeat_count += 1
+            event.last_seen = now
+            event.dirty = True
+            return False
+
+        self._events[key] = PendingEvent(
+            socket_id=socket_id,
+            event_type=event_type,
+            message=message,
+            cooling_until=cooling_until,
+            timestamp=datetime.now(),
+            last_seen=now,
+        )
+        return True
+
+    def take_dirty(self, now: Optional[float] = None) -> List[PendingEvent]:
+        """Get events that need writing and forget written events outside the window."""
+        now = time.monotonic() if now is None else now
+        dirty = [event for event in self._events.values() if event.dirty]
+        for event in dirty:
+            event.dirty = False
+        expired = [
+            key for key, event in self._events.items()
+            if not event.dirty and event.row_id is not None and now - event.last_seen > self.window_seconds
+        ]
+        for key in expired:
+            del self._events[key]
+        return dirty
+
+
+class ThermalEventLogger:
+    """Writes deduplicated thermal events to the database in batches."""
+
+    def __init__(
+            self,
+            window_seconds: float = THERMAL_EVENT_DEDUP_SECONDS,
+            flush_interval_seconds: float = THERMAL_EVENT_FLUSH_SECONDS,
+    ):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._dedup = EventDeduplicator(window_seconds)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def log(self, socket_id: int, event_type: str, message: str = "", cooling_until: Optional[float] = None):
+        """Queue an event for writing (repeats are collapsed)."""
+        with self._lock:
+            is_new = self._dedup.record(socket_id, event_type, message, cooling_until)
+        THERMAL_EVENTS.inc(outcome="logged" if is_new else "collapsed")
+
+    def start(self):
+        """Start writing batches on a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alisto-event-log", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread after a final flush."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing thermal events: {e}")
+
+    def flush(self):
+        """Write pending inserts and repeat-count updates in one transaction."""
+        with self._lock:
+            batch = self._dedup.take_dirty()
+        if not batch:
+            return
+
+        try:
+            self._write(batch)
+        except Exception:
+            # Retry the whole batch on the next flush
+            with self._lock:
+                for event in batch:
+                    event.dirty = True
+            raise
+
+    def _write(self, batch: List[PendingEvent]):
+        inserted = []
+        with rx.session() as session:
+            for event in batch:
+                if event.row_id is None:
+                    row = ThermalEvent(
+                        socket_id=event.socket_id,
+                        event_type=event.event_type,
+                        timestamp=event.timestamp,
+                        message=event.message,
+                        cooling_until=event.cooling_until,
+                        repeat_count=event.repeat_count,
+                    )
+                    session.add(row)
+                    inserted.append((event, row))
+                else:
+                    session.exec(
+                        sqlalchemy.update(ThermalEvent)
+                        .where(ThermalEvent.id == event.row_id)
+                        .values(repeat_count=event.repeat_count)
+                    )
+            with DB_COMMIT_LATENCY.time(table="thermalevent"):
+                session.commit()
+            with self._lock:
+                for event, row in inserted:
+                    event.row_id = row.id
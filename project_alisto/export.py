@@ -0,0 +1,165 @@
+"""Streaming export of socket history and thermal events for Project Alisto.
+
+Rows are read with a streaming cursor (yield_per) as plain column tuples
+and encoded in chunks, so memory use does not depend on how many rows a
+range contains. Served over HTTP at /export/{history,events} and from the
+command line.
+
+Usage:
+    python -m project_alisto.export history --socket 1 --since 2026-01-01 -o history.csv
+    python -m project_alisto.export events --format ndjson --until 2026-02-01T12:00
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import reflex as rx
+import sqlmodel
+
+from project_alisto.models import SocketDataHistory, ThermalEvent
+
+logger = logging.getLogger(__name__)
+
+# Exportable tables and their columns, in output order
+TABLES = {
+    "history": (SocketDataHistory, ("id", "socket_id", "timestamp", "temperature", "current")),
+    "events": (
+        ThermalEvent,
+        ("id", "socket_id", "event_type", "timestamp", "message", "cooling_until", "repeat_count"),
+    ),
+}
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows fetched from the cursor, and encoded into one output chunk, at a time
+CHUNK_ROWS = 1000
+
+
+def export_rows(
+        table: str,
+        socket_ids: Optional[Iterable[int]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[Tuple]:
+    """
+    Stream rows of an exportable table as tuples, oldest first.
+
+    Args:
+        table: "history" or "events"
+        socket_ids: Only export these sockets (all if None or empty)
+        since: Only rows at or after this time
+        until: Only rows before this time
+        chunk_rows: Rows fetched from the database per round trip
+    """
+    model, columns = TABLES[table]
+    query = sqlmodel.select(*(getattr(model, column) for column in columns))
+    socket_ids = list(socket_ids or [])
+    if socket_ids:
+        query = query.where(model.socket_id.in_(socket_ids))
+    if since is not None:
+        query = query.where(model.timestamp >= since)
+    if until is not None:
+        query = query.where(model.timestamp < until)
+    query = query.order_by(model.id).execution_options(yield_per=chunk_rows)
+    with rx.session() as session:
+        yield from session.exec(query)
+
+
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_rows(
+        rows: Iterable[Tuple], columns: Tuple[str, ...], fmt: str, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[str]:
+    """
+    Encode rows as CSV (with a header) or newline-delimited JSON.
+
+    Yields one string per chunk_rows rows rather than one per row.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {tuple(FORMATS)}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(columns)
+    count = 0
+    for row in rows:
+        if fmt == "csv":
+            writer.writerow(_jsonable(value) for value in row)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, map(_jsonable, row)))))
+            buffer.write("\n")
+        count += 1
+        if count == chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(
+        table: str,
+        fmt: str = "csv",
+        socket_ids: Optional[Iterable[int]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Stream an export of a table as encoded chunks (see export_rows for the filters)."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}, expected one of {tuple(TABLES)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {tuple(FORMATS)}")
+    return encode_rows(export_rows(table, socket_ids, since, until), TABLES[table][1], fmt)
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 date or time; None if empty.
+
+    Timestamps are stored as naive local time, so a value with a UTC offset
+    is converted to local time and its offset dropped; one without is taken
+    as local time.
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Export socket history or thermal events.")
+    parser.add_argument("table", choices=TABLES)
+    parser.add_argument("--socket", type=int, action="append", dest="socket_ids", help="Socket ID (repeatable)")
+    parser.add_argument("--since", type=parse_time, help="Start time (ISO 8601, inclusive)")
+    parser.add_argument("--until", type=parse_time, help="End time (ISO 8601, exclusive)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        for chunk in stream_export(args.table, args.format, args.socket_ids, args.since, args.until):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Socket groups and paced bulk on/off control for Project Alisto.
+
+Bulk commands skip sockets already in the target state, then publish one
+control message per socket through a process-wide pacer so that all bulk
+commands together stay under GROUP_COMMAND_RATE. Turn-ons within a command
+are additionally spaced by GROUP_TURN_ON_STAGGER_SECONDS to limit inrush.
+Sockets turned off get a MANUAL_SHUTDOWN event, as with single-socket
+shutdowns from the dashboard.
+
+Usage:
+    python -m project_alisto.group_control create zone-a 1 2 3
+    python -m project_alisto.group_control list
+    python -m project_alisto.group_control run zone-a off
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import reflex as rx
+import sqlmodel
+
+from project_alisto.config import (
+    GROUP_COMMAND_RATE,
+    GROUP_TURN_ON_STAGGER_SECONDS,
+    MQTT_CLIENT_ID,
+    MQTT_TOPIC_SOCKET_CONTROL,
+)
+from project_alisto.metrics import DB_COMMIT_LATENCY
+from project_alisto.models import SocketData, SocketGroup, SocketGroupMember, ThermalEvent
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("on", "off")
+
+
+@dataclass
+class BulkCommandProgress:
+    """Progress of a bulk command."""
+    group: str
+    command: str
+    total: int = 0
+    sent: int = 0
+    skipped: int = 0
+    failed: int = 0
+    running: bool = True
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def plan_bulk_command(
+        sockets: Dict[int, SocketData], socket_ids: Iterable[int], command: str
+) -> Tuple[List[int], List[int]]:
+    """
+    Split sockets into those to command and those to skip. Sockets already
+    in the target state are skipped, as are cooling sockets for "on"
+    (the hardware refuses them). Sockets with unknown state are commanded.
+    """
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command {command!r}, expected one of {COMMANDS}")
+    target_on = command == "on"
+    to_send, skipped = [], []
+    for socket_id in socket_ids:
+        socket = sockets.get(socket_id)
+        if socket is not None and (socket.is_on == target_on or (target_on and socket.is_cooling)):
+            skipped.append(socket_id)
+        else:
+            to_send.append(socket_id)
+    return to_send, skipped
+
+
+class PublishPacer:
+    """Hands out publish slots no closer than 1/rate seconds apart."""
+
+    def __init__(self, rate: float = GROUP_COMMAND_RATE):
+        if rate <= 0:
+            raise ValueError(f"Publish rate must be positive, got {rate}")
+        self.interval = 1.0 / rate
+        self._next = 0.0
+
+    def reserve(self, not_before: float = 0.0) -> float:
+        """Reserve the next free slot (time.monotonic() time) at or after not_before."""
+        slot = max(time.monotonic(), self._next, not_before)
+        self._next = slot + self.interval
+        return slot
+
+
+# Shared by all bulk commands in this process
+PACER = PublishPacer()
+
+
+async def execute_bulk_command(
+        progress: BulkCommandProgress,
+        socket_ids: List[int],
+        publish: Callable[[str, dict], bool],
+        on_progress: Optional[Callable[[BulkCommandProgress], Awaitable[None]]] = None,
+        pacer: PublishPacer = PACER,
+        stagger_seconds: float = GROUP_TURN_ON_STAGGER_SECONDS,
+        on_sent: Optional[Callable[[int], None]] = None,
+) -> BulkCommandProgress:
+    """
+    Publish a command to each socket at the pacer's rate, reporting progress.
+
+    Args:
+        progress: Progress to update (total and skipped already filled in)
+        socket_ids: Sockets to command, in order
+        publish: Callable receiving (topic, payload) that returns success
+        on_progress: Optional coroutine function called after each publish
+        pacer: Rate limiter shared between bulk commands
+        stagger_seconds: Minimum spacing between turn-ons
+        on_sent: Optional callable receiving each socket ID published successfully
+    """
+    last_slot = None
+    try:
+        for socket_id in socket_ids:
+            not_before = 0.0
+            if progress.command == "on" and last_slot is not None:
+                not_before = last_slot + stagger_seconds
+            last_slot = pacer.reserve(not_before)
+            delay = last_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            topic = MQTT_TOPIC_SOCKET_CONTROL.format(socket_id=socket_id)
+            if publish(topic, {"command": progress.command}):
+                progress.sent += 1
+                if on_sent:
+                    on_sent(socket_id)
+            else:
+                progress.failed += 1
+            if on_progress:
+                await on_progress(progress)
+    finally:
+        progress.running = False
+        if on_progress:
+            await on_progress(progress)
+    return progress
+
+
+def log_manual_shutdowns(socket_ids: Iterable[int], group: str):
+    """Log a MANUAL_SHUTDOWN event per socket turned off by a bulk command, in one commit."""
+    socket_ids = list(socket_ids)
+    if not socket_ids:
+        return
+    with rx.session() as session:
+        for socket_id in socket_ids:
+            session.add(ThermalEvent(
+                socket_id=socket_id,
+                event_type="MANUAL_SHUTDOWN",
+                message=f"Socket {socket_id} manually shut down by user (group {group})",
+            ))
+        with DB_COMMIT_LATENCY.time(table="thermalevent"):
+            session.commit()
+
+
+def save_group(name: str, socket_ids: Iterable[int]) -> int:
+    """Create a group or replace its members; returns the group ID."""
+    with rx.session() as session:
+        group = session.exec(sqlmodel.select(SocketGroup).where(SocketGroup.name == name)).first()
+        if group is None:
+            group = SocketGroup(name=name)
+            session.add(group)
+            session.flush()
+        else:
+            for member in session.exec(
+                    sqlmodel.select(SocketGroupMember).where(SocketGroupMember.group_id == group.id)
+            ):
+                session.delete(member)
+        for socket_id in sorted(set(socket_ids)):
+            session.add(SocketGroupMember(group_id=group.id, socket_id=socket_id))
+        session.commit()
+        return group.id
+
+
+def load_groups() -> List[dict]:
+    """Load all groups as {"id", "name", "socket_ids", "size"} dicts, ordered by name."""
+    with rx.session() as session:
+        groups = session.exec(sqlmodel.select(SocketGroup).order_by(SocketGroup.name)).all()
+        members = session.exec(sqlmodel.select(SocketGroupMember)).all()
+    socket_ids: Dict[int, List[int]] = {}
+    for member in members:
+        socket_ids.setdefault(member.group_id, []).append(member.socket_id)
+    return [
+        {
+            "id": group.id,
+            "name": group.name,
+            "socket_ids": sorted(socket_ids.get(group.id, [])),
+            "size": len(socket_ids.get(group.id, [])),
+        }
+        for group in groups
+    ]
+
+
+def _create(args: argparse.Namespace) -> int:
+    save_group(args.name, args.socket_ids)
+    print(f"Group {args.name}: {len(set(args.socket_ids))} socket(s)")
+    return 0
+
+
+def _list(args: argparse.Namespace) -> int:
+    for group in load_groups():
+        print(f"{group['name']}: {', '.join(str(socket_id) for socket_id in group['socket_ids'])}")
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    from project_alisto.mqtt_client import MQTTClient
+    from project_alisto.store import load_socket_states
+
+    group = next((group for group in load_groups() if group["name"] == args.name), None)
+    if group is None:
+        print(f"No group named {args.name}")
+        return 1
+    states, _ = load_socket_states()
+    to_send, skipped = plan_bulk_command(states, group["socket_ids"], args.command)
+    progress = BulkCommandProgress(
+        group=args.name, command=args.command, total=len(group["socket_ids"]), skipped=len(skipped)
+    )
+
+    client = MQTTClient(client_id=f"{MQTT_CLIENT_ID}-control")
+    if not client.connect():
+        return 1
+
+    async def report(progress: BulkCommandProgress):
+        print(f"\r{progress.sent + progress.failed}/{len(to_send)} sent "
+              f"({progress.failed} failed, {progress.skipped} skipped)", end="")
+
+    turned_off = []
+    try:
+        asyncio.run(execute_bulk_command(
+            progress, to_send, client.publish, report, pacer=PublishPacer(args.rate),
+            on_sent=turned_off.append if args.command == "off" else None,
+        ))
+        print()
+    finally:
+        client.disconnect()
+        log_manual_shutdowns(turned_off, args.name)
+    return 0 if progress.failed == 0 else 1
+
+
+def _positive_rate(value: str) -> float:
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"rate must be positive, got {value}")
+    return rate
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Manage socket groups and send bulk commands.")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    create_parser = subparsers.add_parser("create", help="Create or replace a group")
+    create_parser.add_argument("name")
+    create_parser.add_argument("socket_ids", type=int, nargs="+")
+    create_parser.set_defaults(func=_create)
+
+    list_parser = subparsers.add_parser("list", help="List groups")
+    list_parser.set_defaults(func=_list)
+
+    run_parser = subparsers.add_parser("run", help="Send a paced on/off command to a group")
+    run_parser.add_argument("name")
+    run_parser.add_argument("command", choices=COMMANDS)
+    run_parser.add_argument("--rate", type=_positive_rate, default=GROUP_COMMAND_RATE, help="Commands per second")
+    run_parser.set_defaults(func=_run)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
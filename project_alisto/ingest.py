@@ -0,0 +1,216 @@
+"""Headless MQTT ingest pipeline for Project Alisto.
+
+Decodes socket messages, keeps the latest socket state, writes telemetry
+history and logs thermal events, without any Reflex UI state.
+
+Handlers only update the in-memory state and queue history rows. The
+processing thread writes them, with the stored state of every socket that
+changed, in one transaction per batch (INGEST_BATCH_SIZE messages or
+INGEST_BATCH_SECONDS), so a worker takes the database's write lock once per
+batch rather than once per message. Stored state is diffed against the
+last state that was committed, so a failed write is retried with the next
+batch instead of being lost.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import reflex as rx
+
+from project_alisto.config import INGEST_BATCH_SECONDS, INGEST_BATCH_SIZE, NUM_SOCKETS
+from project_alisto.diagnostics import profiled
+from project_alisto.event_log import ThermalEventLogger
+from project_alisto.logic import handle_socket_data, handle_socket_status, parse_socket_topic
+from project_alisto.metrics import DB_COMMIT_LATENCY, HANDLER_LATENCY, QUEUE_DEPTH, QUEUE_LAG
+from project_alisto.models import SocketData, SocketDataHistory
+from project_alisto.store import SOCKET_STATE_FIELDS, next_state_version, save_socket_state
+
+logger = logging.getLogger(__name__)
+
+# History rows kept for retry while writes fail, in batches (oldest dropped first)
+MAX_PENDING_BATCHES = 100
+
+
+def changed_fields(previous: SocketData, socket: SocketData) -> List[str]:
+    """Get the stored SocketState fields that differ between two socket states."""
+    return [field for field in SOCKET_STATE_FIELDS if getattr(previous, field) != getattr(socket, field)]
+
+
+class IngestPipeline:
+    """Routes decoded MQTT messages to socket state, history and event storage."""
+
+    def __init__(
+            self,
+            socket_ids: Optional[Iterable[int]] = None,
+            batch_size: int = INGEST_BATCH_SIZE,
+            batch_seconds: float = INGEST_BATCH_SECONDS,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            socket_ids: Sockets to accept messages for (defaults to 1..NUM_SOCKETS)
+            batch_size: Messages per write transaction at most
+            batch_seconds: Longest wait between a batch's first message and its write
+        """
+        if socket_ids is None:
+            socket_ids = range(1, NUM_SOCKETS + 1)
+        self.sockets: Dict[int, SocketData] = {
+            socket_id: SocketData(socket_id=socket_id) for socket_id in socket_ids
+        }
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.events = ThermalEventLogger()
+        # Last committed state per socket, and what is waiting for the next write
+        self._saved: Dict[int, SocketData] = {
+            socket_id: SocketData(socket_id=socket_id) for socket_id in self.sockets
+        }
+        self._history: List[Tuple[int, datetime, float, float]] = []
+        self._dirty: Set[int] = set()
+        self._queue: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, topic: str, payload: dict, received_at: Optional[float] = None):
+        """Queue a decoded MQTT message (called from the MQTT network thread)."""
+        self._queue.put((topic, payload, time.time() if received_at is None else received_at))
+        QUEUE_DEPTH.inc()
+
+    def start(self):
+        """Start processing queued messages on a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="alisto-ingest", daemon=True)
+            self._thread.start()
+        self.events.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the messages already queued have been processed and written."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.events.stop(timeout)
+
+    def run(self):
+        """Process queued messages in batches until stopped and the queue is empty."""
+        batch_started = None
+        count = 0
+        while not (self._stop.is_set() and self._queue.empty()):
+            timeout = 0.1 if batch_started is None else max(batch_started + self.batch_seconds - time.monotonic(), 0)
+            try:
+                topic, payload, received_at = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                QUEUE_DEPTH.dec()
+                QUEUE_LAG.observe(time.time() - received_at)
+                try:
+                    self.handle_mqtt_message(topic, payload)
+                except Exception as e:
+                    logger.error(f"Error handling message on {topic}: {e}")
+                count += 1
+                if batch_started is None:
+                    batch_started = time.monotonic()
+            if batch_started is not None and (
+                    count >= self.batch_size or time.monotonic() >= batch_started + self.batch_seconds
+            ):
+                # A failed write stays pending and is retried after another batch interval
+                batch_started = None if self.flush() else time.monotonic()
+                count = 0
+        self.flush()
+
+    def flush(self) -> bool:
+        """
+        Write pending history rows and changed socket states in one transaction.
+
+        Returns:
+            True if written (or nothing was pending), False if the write
+            failed; everything then stays pending for the next flush
+        """
+        if not self._history and not self._dirty:
+            return True
+        history = len(self._history)
+        states = {socket_id: replace(self.sockets[socket_id]) for socket_id in self._dirty}
+        changes = {}
+        for socket_id, socket in states.items():
+            changed = changed_fields(self._saved[socket_id], socket)
+            if changed:
+                changes[socket_id] = changed
+        try:
+            with rx.session() as session:
+                session.add_all(
+                    SocketDataHistory(
+                        socket_id=socket_id, timestamp=timestamp, temperature=temperature, current=current
+                    )
+                    for socket_id, timestamp, temperature, current in self._history[:history]
+                )
+                if changes:
+                    # Taken last: it locks the version counter until the commit
+                    version = next_state_version(session)
+                    for socket_id, changed in changes.items():
+                        save_socket_state(session, states[socket_id], changed, version)
+                with DB_COMMIT_LATENCY.time(table="socketdatahistory"):
+                    session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {history} history row(s) and {len(states)} socket state(s): {e}")
+            overflow = len(self._history) - MAX_PENDING_BATCHES * self.batch_size
+            if overflow > 0:
+                logger.warning(f"Dropping the {overflow} oldest unwritten history row(s)")
+                del self._history[:overflow]
+            return False
+        del self._history[:history]
+        self._saved.update(states)
+        self._dirty.difference_update(states)
+        return True
+
+    @profiled("handle_mqtt_message")
+    def handle_mqtt_message(self, topic: str, payload: dict):
+        """Process a single MQTT message."""
+        parsed = parse_socket_topic(topic)
+        if parsed is None:
+            return
+
+        socket_id, message_type = parsed
+        if socket_id not in self.sockets:
+            return
+
+        if message_type == "data":
+            with HANDLER_LATENCY.time(handler="process_socket_data"):
+                self.process_socket_data(socket_id, payload)
+        elif message_type == "status":
+            with HANDLER_LATENCY.time(handler="process_socket_status"):
+                self.process_socket_status(socket_id, payload)
+
+    @profiled("process_socket_data")
+    def process_socket_data(self, socket_id: int, data: dict):
+        """Update socket sensor data and queue a history row."""
+        socket = handle_socket_data(self.sockets[socket_id], data)
+        self._history.append((socket_id, datetime.now(), socket.temperature, socket.current))
+        self._dirty.add(socket_id)
+
+    @profiled("process_socket_status")
+    def process_socket_status(self, socket_id: int, message: dict):
+        """Apply a status message and log any resulting thermal event."""
+        updated_socket, new_event = handle_socket_status(self.sockets[socket_id], message)
+        self.sockets[socket_id] = updated_socket
+        # Resent statuses (e.g. a flapping THERMAL_SHUTDOWN) leave nothing to store (see flush)
+        self._dirty.add(socket_id)
+
+        if new_event:
+            self.add_thermal_event(
+                socket_id=new_event.socket_id,
+                event_type=new_event.event_type,
+                message=new_event.message,
+                cooling_until=new_event.cooling_until
+            )
+
+    def add_thermal_event(
+            self, socket_id: int, event_type: str, message: str = "", cooling_until: Optional[float] = None
+    ):
+        """Queue a thermal event for (deduplicated, batched) logging."""
+        self.events.log(socket_id, event_type, message, cooling_until)
@@ -0,0 +1,269 @@
+"""Process-wide last-known socket state for the dashboard.
+
+One cache per backend process holds the latest state of every socket, the
+recent thermal events and the socket groups. A single refresher thread seeds it once at
+startup (stored socket state, falling back to the newest history reading,
+and optionally retained MQTT messages), off the event loop, and then keeps
+it current by reading only the socket states the ingest worker wrote since
+the newest version it has seen. Sessions hydrate from a snapshot
+instead of starting blank or querying the database themselves. Status
+colors are evaluated here for all sockets at once (see thermal_rules), so
+every session shares the same hysteresis state.
+
+SocketData objects held by the cache are never mutated; updates replace
+them, so snapshots can share them.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from typing import Any, Dict, List, Tuple
+
+from project_alisto.config import (
+    LIVE_STATE_REFRESH_SECONDS,
+    LIVE_STATE_SEED_RETAINED,
+    MQTT_CLIENT_ID,
+    MQTT_TOPIC_ALL_SOCKET_DATA,
+    MQTT_TOPIC_ALL_SOCKET_STATUS,
+    NUM_SOCKETS,
+    TREND_BUCKET_SECONDS,
+    TREND_POINTS,
+)
+from project_alisto.group_control import load_groups
+from project_alisto.logic import handle_socket_data, handle_socket_status, parse_socket_topic
+from project_alisto.models import SocketData, ThermalEvent, ThermalEventRow, ThermalLimits
+from project_alisto.store import (
+    load_latest_history,
+    load_recent_events,
+    load_socket_states,
+    thermal_event_row,
+    trend_point,
+)
+from project_alisto.thermal_rules import ThermalRuleEvaluator, load_socket_limits
+
+logger = logging.getLogger(__name__)
+
+# Thermal events kept for the dashboard's event list
+RECENT_EVENTS_LIMIT = 50
+
+
+class LiveStateCache:
+    """Thread-safe latest socket state and recent events, with a version counter."""
+
+    def __init__(self, num_sockets: int = NUM_SOCKETS, bucket_seconds: float = TREND_BUCKET_SECONDS):
+        self.version = 0
+        self._sockets: Dict[int, SocketData] = {
+            socket_id: SocketData(socket_id=socket_id) for socket_id in range(1, num_sockets + 1)
+        }
+        self._events: List[ThermalEventRow] = []
+        self._rules = ThermalRuleEvaluator(self._sockets)
+        self._limits: Dict[int, ThermalLimits] = self._rules.limits()
+        self._groups: List[Dict[str, Any]] = []
+        # Live trend charts: closed bucket averages per socket (fixed size), and
+        # the open bucket per socket as [bucket index, count, temperature sum, current sum]
+        self.bucket_seconds = bucket_seconds
+        self._trends: Dict[int, deque] = {}
+        self._open_buckets: Dict[int, list] = {}
+        self._events_key: Tuple = ()
+        self._after_version = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+
+    def snapshot(self) -> Tuple[int, Dict[int, SocketData], List[ThermalEventRow]]:
+        """Get (version, sockets, recent events) as one consistent copy."""
+        with self._lock:
+            return self.version, dict(self._sockets), list(self._events)
+
+    def limits(self) -> Dict[int, ThermalLimits]:
+        """Get the effective thermal limits per socket."""
+        with self._lock:
+            return dict(self._limits)
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """Get the socket groups (see group_control.load_groups)."""
+        with self._lock:
+            return list(self._groups)
+
+    def update_sockets(self, sockets: Dict[int, SocketData]):
+        """Replace the state of the given sockets."""
+        changed = {}
+        for socket_id, socket in sockets.items():
+            previous = self._sockets.get(socket_id)
+            # Incoming state never carries a status color; it is derived below
+            if previous is None or replace(socket, status_color=previous.status_color) != previous:
+                changed[socket_id] = socket
+        if not changed:
+            return
+        now = time.time()
+        with self._lock:
+            for socket_id, socket in changed.items():
+                previous = self._sockets.get(socket_id)
+                if previous is None or (previous.temperature, previous.current) != (socket.temperature, socket.current):
+                    self._add_trend_reading(socket_id, now, socket.temperature, socket.current)
+            self._sockets.update(changed)
+            self._apply_status_colors()
+            self.version += 1
+
+    def update_limits(self, limits: Dict[int, ThermalLimits]):
+        """Replace per-socket thermal limits and re-evaluate status colors if any changed."""
+        with self._lock:
+            if not self._rules.set_limits(limits):
+                return
+            self._limits = self._rules.limits()
+            self._apply_status_colors()
+            self.version += 1
+
+    def update_groups(self, groups: List[Dict[str, Any]]):
+        """Replace the socket groups if they changed."""
+        with self._lock:
+            if groups == self._groups:
+                return
+            self._groups = groups
+            self.version += 1
+
+    def _load_groups_and_limits(self):
+        """Load the groups, and resolve limits with their memberships."""
+        groups = load_groups()
+        group_members = {group["id"]: group["socket_ids"] for group in groups}
+        self.update_limits(load_socket_limits(self._sockets, group_members))
+        self.update_groups(groups)
+
+    def _apply_status_colors(self):
+        """Evaluate every socket in one batch and replace those whose color changed (lock held)."""
+        for socket_id, color in self._rules.evaluate(self._sockets).items():
+            socket = self._sockets[socket_id]
+            if socket.status_color != color:
+                self._sockets[socket_id] = replace(socket, status_color=color)
+
+    def _add_trend_reading(self, socket_id: int, now: float, temperature: float, current: float):
+        """Add a reading to the socket's open trend bucket (lock held)."""
+        index = int(now // self.bucket_seconds)
+        self._close_trend_bucket(socket_id, index)
+        bucket = self._open_buckets.get(socket_id)
+        if bucket is None:
+            bucket = self._open_buckets[socket_id] = [index, 0, 0.0, 0.0]
+        bucket[1] += 1
+        bucket[2] += temperature
+        bucket[3] += current
+
+    def _close_trend_bucket(self, socket_id: int, index: int):
+        """Append the socket's open bucket as a point if it is older than bucket index (lock held)."""
+        bucket = self._open_buckets.get(socket_id)
+        if bucket is None or bucket[0] >= index:
+            return
+        del self._open_buckets[socket_id]
+        opened, count, temperature_sum, current_sum = bucket
+        trend = self._trends.get(socket_id)
+        if trend is None:
+            trend = self._trends[socket_id] = deque(maxlen=TREND_POINTS)
+        trend.append(trend_point(
+            (opened + 0.5) * self.bucket_seconds, temperature_sum / count, current_sum / count
+        ))
+
+    def trend_since(self, socket_id: int, since: float) -> List[dict]:
+        """Get a socket's closed live trend points newer than a Unix timestamp."""
+        with self._lock:
+            self._close_trend_bucket(socket_id, int(time.time() // self.bucket_seconds))
+            trend = self._trends.get(socket_id)
+            if not trend:
+                return []
+            return [point for point in trend if point["ts"] > since]
+
+    def update_events(self, events: List[ThermalEvent]):
+        """Replace the recent events if any were added or changed."""
+        key = tuple((event.id, event.repeat_count) for event in events)
+        if key == self._events_key:
+            return
+        rows = [thermal_event_row(event) for event in events]
+        with self._lock:
+            self._events = rows
+            self._events_key = key
+            self.version += 1
+
+    def apply_message(self, topic: str, payload: dict):
+        """Apply a decoded socket MQTT message (e.g. a retained one)."""
+        parsed = parse_socket_topic(topic)
+        if parsed is None or parsed[0] not in self._sockets:
+            return
+        socket_id, message_type = parsed
+        socket = SocketData(**vars(self._sockets[socket_id]))
+        if message_type == "data":
+            socket = handle_socket_data(socket, payload)
+        elif message_type == "status":
+            socket, _ = handle_socket_status(socket, payload)
+        self.update_sockets({socket_id: socket})
+
+    def seed_from_store(self):
+        """Seed groups and limits, then socket state (or the newest history row where there is none)."""
+        self._load_groups_and_limits()
+        stored, self._after_version = load_socket_states()
+        missing = [socket_id for socket_id in self._sockets if socket_id not in stored]
+        if missing:
+            stored.update(load_latest_history(missing))
+        self.update_sockets({
+            socket_id: socket for socket_id, socket in stored.items() if socket_id in self._sockets
+        })
+        self.update_events(load_recent_events(RECENT_EVENTS_LIMIT))
+
+    def seed_from_retained(self, timeout: float = 1.0):
+        """Apply retained MQTT messages delivered right after subscribing."""
+        from project_alisto.mqtt_client import MQTTClient
+
+        client = MQTTClient(message_callback=self.apply_message, client_id=f"{MQTT_CLIENT_ID}-seed")
+        if not client.connect():
+            return
+        try:
+            client.subscribe(MQTT_TOPIC_ALL_SOCKET_DATA)
+            client.subscribe(MQTT_TOPIC_ALL_SOCKET_STATUS)
+            time.sleep(timeout)
+        finally:
+            client.disconnect()
+
+    def refresh(self):
+        """Read groups and limits, and socket states and events changed since the last refresh."""
+        self._load_groups_and_limits()
+        stored, self._after_version = load_socket_states(self._after_version)
+        self.update_sockets({
+            socket_id: socket for socket_id, socket in stored.items() if socket_id in self._sockets
+        })
+        self.update_events(load_recent_events(RECENT_EVENTS_LIMIT))
+
+    def start(self):
+        """Start the refresher thread, which seeds the cache first (once per process, non-blocking)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="alisto-live-state", daemon=True).start()
+
+    def stop(self):
+        """Stop the refresher thread."""
+        self._stop.set()
+
+    def seed(self):
+        """Seed from the database, then from retained MQTT messages if enabled."""
+        try:
+            self.seed_from_store()
+        except Exception as e:
+            logger.error(f"Failed to seed live state from the database: {e}")
+        if LIVE_STATE_SEED_RETAINED:
+            self.seed_from_retained()
+
+    def _run(self):
+        self.seed()
+        while not self._stop.wait(LIVE_STATE_REFRESH_SECONDS):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh live state: {e}")
+
+
+LIVE_STATE = LiveStateCache()
+
+
+def start_live_state():
+    """Lifespan task that starts seeding the cache when the backend starts."""
+    LIVE_STATE.start()
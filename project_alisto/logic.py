@@ -1,6 +1,8 @@
-from .models import SocketData, ThermalEvent
+import re
 from typing import Optional, Tuple
 
+from .models import SocketData, ThermalEvent
+
 
 def handle_socket_status(
         current_socket: SocketData, message: dict
@@ -19,10 +21,36 @@ def handle_socket_status(
             socket_id=current_socket.socket_id,
             event_type="THERMAL_SHUTDOWN",
             timestamp=message["timestamp"],
-            message=f"Socket {current_socket.socket_id} auto-shutdown."
+            message=f"Socket {current_socket.socket_id} auto-shutdown.",
+            cooling_until=message["cooling_until"]
         )
     elif message["status"] == "NORMAL":
         current_socket.is_cooling = False
         current_socket.cooling_until = None
 
     return current_socket, new_event
+
+
+def handle_socket_data(current_socket: SocketData, data: dict) -> SocketData:
+    """
+    Applies a sensor data message and returns the updated socket state.
+    Fields missing from the message keep their current values.
+    """
+    current_socket.temperature = data.get("temperature", current_socket.temperature)
+    current_socket.current = data.get("current", current_socket.current)
+    current_socket.is_on = data.get("is_on", current_socket.is_on)
+    return current_socket
+
+
+_SOCKET_TOPIC_RE = re.compile(r'/socket/(\d+)/(\w+)$')
+
+
+def parse_socket_topic(topic: str) -> Optional[Tuple[int, str]]:
+    """
+    Extracts (socket_id, message_type) from a socket topic such as
+    'alisto/socket/3/data', or returns None for unrelated topics.
+    """
+    match = _SOCKET_TOPIC_RE.search(topic)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
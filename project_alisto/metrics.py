@@ -0,0 +1,344 @@
+"""In-process metrics for Project Alisto, exported in Prometheus text format."""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency buckets in seconds (1ms .. 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label pairs as {name="value",...}."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """Base class for a named metric with optional labels."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Build the label-value key for a sample."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Render HELP, TYPE and sample lines for this metric."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Increment the counter."""
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Get the current value for a label set."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def set(self, value: float, **labels: str):
+        """Set the gauge to a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Increment the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        """Decrement the gauge."""
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (unlabelled) gauge value from a callback at render time."""
+        self._function = function
+
+    def value(self, **labels: str) -> float:
+        """Get the current value for a label set."""
+        if self._function is not None and not labels:
+            return float(self._function())
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (e.g. latencies in seconds)."""
+
+    metric_type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Record a single observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Context manager that observes the elapsed wall time of its block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Get the number of observations for a label set."""
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric to the registry and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        if not self._metrics:
+            return ""
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+def topic_type(topic: str) -> str:
+    """Get the message type (last topic segment, e.g. 'data' or 'status')."""
+    return topic.rsplit("/", 1)[-1] or "unknown"
+
+
+# Metrics exported by every process
+REGISTRY = MetricsRegistry()
+# Metrics exported only by the ingest worker, and only by the dashboard
+INGEST_REGISTRY = MetricsRegistry()
+DASHBOARD_REGISTRY = MetricsRegistry()
+
+
+def render(*registries: MetricsRegistry) -> str:
+    """Render several registries as one exposition."""
+    return "".join(registry.render() for registry in registries)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the server's registries at /metrics, and its POST routes."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        self._send(200, CONTENT_TYPE, render(*self.server.registries).encode("utf-8"))
+
+    def do_POST(self):
+        path, _, query = self.path.partition("?")
+        route = self.server.post_routes.get(path)
+        if route is None:
+            self.send_error(404)
+            return
+        status, payload = route(self.headers.get("Authorization", ""), dict(parse_qsl(query)))
+        self._send(status, "application/json", json.dumps(payload).encode("utf-8"))
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# A POST route gets the Authorization header and the query parameters and
+# returns an HTTP status and a JSON body
+PostRoute = Callable[[str, Dict[str, str]], Tuple[int, dict]]
+
+
+def start_http_server(
+        port: int,
+        host: str = "0.0.0.0",
+        registries: Sequence[MetricsRegistry] = (REGISTRY, INGEST_REGISTRY),
+        post_routes: Optional[Dict[str, PostRoute]] = None,
+) -> ThreadingHTTPServer:
+    """Serve /metrics (and any POST routes) from a daemon thread (for processes without the Reflex backend)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.registries = tuple(registries)
+    server.post_routes = dict(post_routes or {})
+    threading.Thread(target=server.serve_forever, name="alisto-metrics", daemon=True).start()
+    return server
+
+
+MESSAGES_RECEIVED = INGEST_REGISTRY.register(Counter(
+    "alisto_mqtt_messages_received_total",
+    "MQTT messages received, by topic type.",
+    ("topic_type",),
+))
+MESSAGES_DECODED = INGEST_REGISTRY.register(Counter(
+    "alisto_mqtt_messages_decoded_total",
+    "MQTT messages successfully decoded, by topic type.",
+    ("topic_type",),
+))
+DECODE_ERRORS = INGEST_REGISTRY.register(Counter(
+    "alisto_mqtt_decode_errors_total",
+    "MQTT messages that failed to decode, by topic type.",
+    ("topic_type",),
+))
+MQTT_RECONNECTS = REGISTRY.register(Counter(
+    "alisto_mqtt_reconnects_total",
+    "Successful MQTT reconnections after the initial connection.",
+))
+QUEUE_DEPTH = INGEST_REGISTRY.register(Gauge(
+    "alisto_message_queue_depth",
+    "MQTT messages waiting to be processed.",
+))
+QUEUE_LAG = INGEST_REGISTRY.register(Histogram(
+    "alisto_message_queue_lag_seconds",
+    "Time between receiving an MQTT message and processing it.",
+))
+HANDLER_LATENCY = INGEST_REGISTRY.register(Histogram(
+    "alisto_handler_duration_seconds",
+    "Time spent in message handlers, by handler.",
+    ("handler",),
+))
+DB_COMMIT_LATENCY = REGISTRY.register(Histogram(
+    "alisto_db_commit_duration_seconds",
+    "Time spent committing database sessions, by table.",
+    ("table",),
+))
+EVENT_LOOP_LAG = DASHBOARD_REGISTRY.register(Histogram(
+    "alisto_event_loop_lag_seconds",
+    "How late the dashboard event loop's heartbeat woke up.",
+))
+THERMAL_EVENTS = INGEST_REGISTRY.register(Counter(
+    "alisto_thermal_events_total",
+    "Thermal events seen by the ingest pipeline, by outcome (logged or collapsed).",
+    ("outcome",),
+))
+
+# Its value function is set by the app, which knows the connected clients
+ACTIVE_SESSIONS = DASHBOARD_REGISTRY.register(Gauge(
+    "alisto_active_sessions",
+    "Dashboard clients with an open websocket to this backend process.",
+))
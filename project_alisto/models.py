@@ -14,6 +14,43 @@ class SocketDataHistory(rx.Model, table=True):
     temperature: float = 0.0
     current: float = 0.0
 
+class SocketState(rx.Model, table=True):
+    """Latest known state of a socket, written by the ingest worker."""
+    id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
+    socket_id: int = sqlmodel.Field(index=True, unique=True)
+    temperature: float = 0.0
+    current: float = 0.0
+    is_on: bool = False
+    is_cooling: bool = False
+    cooling_until: Optional[float] = None  # Unix timestamp from hardware
+    updated_at: datetime = sqlmodel.Field(default_factory=datetime.now)
+    # Taken from SocketStateVersion by the transaction that wrote the row
+    version: int = sqlmodel.Field(default=0, index=True)
+
+class SocketStateVersion(rx.Model, table=True):
+    """Single-row counter handing out SocketState versions in commit order."""
+    id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
+    version: int = 0
+
+class SocketGroup(rx.Model, table=True):
+    """Named group of sockets (e.g. a zone) for bulk control."""
+    id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
+    name: str = sqlmodel.Field(index=True, unique=True)
+
+class SocketGroupMember(rx.Model, table=True):
+    """Membership of a socket in a group."""
+    id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
+    group_id: int = sqlmodel.Field(foreign_key="socketgroup.id", index=True)
+    socket_id: int = sqlmodel.Field(index=True)
+
+class ThermalLimitProfile(rx.Model, table=True):
+    """Thermal limits for one socket, or for every socket in a group."""
+    id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)
+    socket_id: Optional[int] = sqlmodel.Field(default=None, index=True, unique=True)
+    group_id: Optional[int] = sqlmodel.Field(default=None, foreign_key="socketgroup.id", index=True, unique=True)
+    max_temperature: float = 60.0  # Celsius
+    max_current: float = 15.0  # Amperes
+
 @dataclass
 class SocketData:
     """Socket sensor data and status from hardware."""
@@ -24,15 +61,27 @@ class SocketData:
     is_cooling: bool = False
     cooling_until: Optional[float] = None  # Unix timestamp from hardware
     cooling_time_remaining: str = ""  # Formatted time remaining string
+    status_color: str = "gray"  # Badge color, precomputed by thermal_rules
 
 
 @dataclass
 class ThermalLimits:
-    """Thermal limits for UI display/reference only."""
+    """Thermal limits for UI display and status colors."""
     max_temperature: float = 60.0  # Celsius
     max_current: float = 15.0  # Amperes
 
 
+@dataclass
+class ThermalEventRow:
+    """Thermal event as shown on the dashboard (timestamp formatted on the backend)."""
+    id: int
+    socket_id: int
+    event_type: str
+    message: str = ""
+    formatted_timestamp: str = ""
+    repeat_count: int = 1
+
+
 class ThermalEvent(rx.Model, table=True):
     """Thermal event log entry."""
     id: Optional[int] = sqlmodel.Field(default=None, primary_key=True)  # <--- CHANGED
@@ -40,3 +89,5 @@ class ThermalEvent(rx.Model, table=True):
     event_type: str
     timestamp: datetime = sqlmodel.Field(default_factory=datetime.now)  # <--- CHANGED
     message: str = ""
+    cooling_until: Optional[float] = None  # Cooling period the event belongs to
+    repeat_count: int = 1  # Number of identical events collapsed into this row
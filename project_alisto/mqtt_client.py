@@ -7,6 +7,7 @@ from typing import Callable, Optional
 
 import paho.mqtt.client as mqtt
 
+from project_alisto.capture import CaptureWriter, get_recorder
 from project_alisto.config import (
     MQTT_BROKER_HOST,
     MQTT_BROKER_PORT,
@@ -14,6 +15,13 @@ from project_alisto.config import (
     MQTT_PASSWORD,
     MQTT_USERNAME,
 )
+from project_alisto.metrics import (
+    DECODE_ERRORS,
+    MESSAGES_DECODED,
+    MESSAGES_RECEIVED,
+    MQTT_RECONNECTS,
+    topic_type,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,16 +29,27 @@ logger = logging.getLogger(__name__)
 class MQTTClient:
     """Thread-safe MQTT client wrapper."""
 
-    def __init__(self, message_callback: Optional[Callable] = None):
+    def __init__(
+            self,
+            message_callback: Optional[Callable] = None,
+            recorder: Optional[CaptureWriter] = None,
+            client_id: Optional[str] = None,
+    ):
         """
         Initialize MQTT client.
 
         Args:
             message_callback: Optional callback function that receives (topic, payload_dict)
+            recorder: Optional capture writer for raw incoming messages
+                (defaults to the MQTT_CAPTURE_PATH recorder, if configured)
+            client_id: Optional client ID (defaults to MQTT_CLIENT_ID)
         """
-        self.client = mqtt.Client(client_id=MQTT_CLIENT_ID)
+        self.client = mqtt.Client(client_id=client_id or MQTT_CLIENT_ID)
         self.message_callback = message_callback
+        self.recorder = recorder if recorder is not None else get_recorder()
         self.connected = False
+        self._has_connected = False
+        self._subscriptions = {}  # topic -> qos, restored after reconnecting
         self._lock = threading.Lock()
 
         # Set up callbacks
@@ -47,6 +66,11 @@ class MQTTClient:
         """Handle MQTT connection."""
         if rc == 0:
             self.connected = True
+            if self._has_connected:
+                MQTT_RECONNECTS.inc()
+                for topic, qos in self._subscriptions.items():
+                    self.client.subscribe(topic, qos)
+            self._has_connected = True
             logger.info(f"Connected to MQTT broker at {MQTT_BROKER_HOST}:{MQTT_BROKER_PORT}")
         else:
             self.connected = False
@@ -62,15 +86,24 @@ class MQTTClient:
 
     def _on_message(self, client, userdata, msg):
         """Handle incoming MQTT messages."""
+        if self.recorder:
+            self.recorder.record(msg.topic, msg.payload)
+        self.dispatch_raw(msg.topic, msg.payload)
+
+    def dispatch_raw(self, topic: str, raw_payload: bytes):
+        """Decode a raw message and pass it to the message callback (also used for replay)."""
+        kind = topic_type(topic)
+        MESSAGES_RECEIVED.inc(topic_type=kind)
         try:
-            topic = msg.topic
-            payload = json.loads(msg.payload.decode("utf-8"))
+            payload = json.loads(raw_payload.decode("utf-8"))
+            MESSAGES_DECODED.inc(topic_type=kind)
             logger.debug(f"Received MQTT message on {topic}: {payload}")
 
             # Call the message callback if provided
             if self.message_callback:
                 self.message_callback(topic, payload)
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            DECODE_ERRORS.inc(topic_type=kind)
             logger.error(f"Failed to decode MQTT message: {e}")
         except Exception as e:
             logger.error(f"Error processing MQTT message: {e}")
@@ -102,6 +135,7 @@ class MQTTClient:
 
     def subscribe(self, topic: str, qos: int = 0) -> bool:
         """Subscribe to an MQTT topic."""
+        self._subscriptions[topic] = qos
         try:
             result = self.client.subscribe(topic, qos)
             if result[0] == mqtt.MQTT_ERR_SUCCESS:
@@ -129,6 +163,19 @@ class MQTTClient:
             logger.error(f"Error publishing to topic {topic}: {e}")
             return False
 
+    def publish_raw(self, topic: str, payload: bytes, qos: int = 0) -> bool:
+        """Publish an already-encoded payload to an MQTT topic."""
+        try:
+            result = self.client.publish(topic, payload, qos)
+            if result[0] == mqtt.MQTT_ERR_SUCCESS:
+                return True
+            else:
+                logger.error(f"Failed to publish to topic: {topic}")
+                return False
+        except Exception as e:
+            logger.error(f"Error publishing to topic {topic}: {e}")
+            return False
+
     def is_connected(self) -> bool:
         """Check if client is connected."""
         return self.connected
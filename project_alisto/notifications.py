@@ -0,0 +1,114 @@
+"""Batched, rate-limited browser notifications for Project Alisto.
+
+Notifications reach the browser as data, not script: the session's
+`notification` state var holds the latest payload, and the notification
+listener component hands it to the handler preinstalled by
+assets/alisto_notify.js whenever its sequence number changes.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from project_alisto.config import NOTIFICATION_MIN_INTERVAL_SECONDS, NOTIFICATION_WINDOW_SECONDS
+
+# Client-side handler installed by assets/alisto_notify.js
+CLIENT_HANDLER = "window.alistoNotify"
+
+# How each alert kind reads in a notification ("Socket 3 shut down")
+KIND_LABELS = {
+    "THERMAL_SHUTDOWN": "shut down",
+}
+
+# Socket IDs listed in a notification body before summarizing the rest
+MAX_LISTED_SOCKETS = 10
+
+
+@dataclass
+class Alert:
+    """A single socket alert waiting to be notified."""
+    kind: str
+    socket_id: int
+
+
+def _kind_label(kind: str) -> str:
+    return KIND_LABELS.get(kind, kind.lower().replace("_", " "))
+
+
+def _socket_list(socket_ids: List[int]) -> str:
+    listed = ", ".join(str(socket_id) for socket_id in socket_ids[:MAX_LISTED_SOCKETS])
+    if len(socket_ids) > MAX_LISTED_SOCKETS:
+        listed += f" and {len(socket_ids) - MAX_LISTED_SOCKETS} more"
+    return listed
+
+
+def build_notification(alerts: List[Alert]) -> dict:
+    """Aggregate alerts into a single notification payload."""
+    by_kind: Dict[str, List[int]] = {}
+    for alert in alerts:
+        socket_ids = by_kind.setdefault(alert.kind, [])
+        if alert.socket_id not in socket_ids:
+            socket_ids.append(alert.socket_id)
+    for socket_ids in by_kind.values():
+        socket_ids.sort()
+
+    count = sum(len(socket_ids) for socket_ids in by_kind.values())
+    if len(by_kind) == 1:
+        kind, socket_ids = next(iter(by_kind.items()))
+        if count == 1:
+            title = f"Socket {socket_ids[0]} {_kind_label(kind)}"
+        else:
+            title = f"{count} sockets {_kind_label(kind)}"
+    else:
+        title = f"{count} socket alerts"
+
+    body = "; ".join(
+        f"{_kind_label(kind).capitalize()}: socket(s) {_socket_list(socket_ids)}"
+        for kind, socket_ids in by_kind.items()
+    )
+    return {
+        "title": title,
+        "body": body,
+        "count": count,
+        "alerts": {kind: socket_ids for kind, socket_ids in by_kind.items()},
+    }
+
+
+@dataclass
+class NotificationDispatcher:
+    """
+    Collects alerts for one session and releases them as one notification
+    per window, at most once per minimum interval.
+    """
+    window_seconds: float = NOTIFICATION_WINDOW_SECONDS
+    min_interval_seconds: float = NOTIFICATION_MIN_INTERVAL_SECONDS
+    pending: List[Alert] = field(default_factory=list)
+    window_started: Optional[float] = None
+    last_sent: Optional[float] = None
+
+    def add(self, kind: str, socket_id: int, now: Optional[float] = None):
+        """Queue an alert; the first alert opens a new batching window."""
+        if not self.pending:
+            self.window_started = time.monotonic() if now is None else now
+        self.pending.append(Alert(kind=kind, socket_id=socket_id))
+
+    def flush(self, now: Optional[float] = None) -> Optional[dict]:
+        """Get the aggregated notification if the window closed and the rate limit allows."""
+        if not self.pending:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - self.window_started < self.window_seconds:
+            return None
+        if self.last_sent is not None and now - self.last_sent < self.min_interval_seconds:
+            return None
+
+        payload = build_notification(self.pending)
+        self.pending = []
+        self.window_started = None
+        self.last_sent = now
+        return payload
+
+
+def stamp_notification(payload: dict, previous_seq: int = 0) -> dict:
+    """Add the sequence number the client uses to show each payload once."""
+    return {**payload, "seq": previous_seq + 1}
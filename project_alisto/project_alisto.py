@@ -1,26 +1,51 @@
 import asyncio
-import re
 import time
 from dataclasses import replace
-from typing import Dict, List
+from datetime import datetime
+from typing import Any, Dict, List, Mapping
 
 import reflex as rx
-
-from .logic import handle_socket_status
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
 
 from project_alisto.config import (
     COOLING_PERIOD_MINUTES,
     DEFAULT_MAX_CURRENT,
     DEFAULT_MAX_TEMPERATURE,
     MQTT_TOPIC_SOCKET_CONTROL,
-    MQTT_TOPIC_SOCKET_DATA,
-    MQTT_TOPIC_SOCKET_STATUS,
     NUM_SOCKETS,
+    TREND_BUCKET_SECONDS,
+    TREND_POINTS,
+)
+from project_alisto.diagnostics import profile_request, start_loop_watchdog
+from project_alisto.export import FORMATS, TABLES, parse_time, stream_export
+from project_alisto.group_control import (
+    BulkCommandProgress,
+    execute_bulk_command,
+    log_manual_shutdowns,
+    plan_bulk_command,
+)
+from project_alisto.live_state import LIVE_STATE, start_live_state
+from project_alisto.metrics import (
+    CONTENT_TYPE,
+    DASHBOARD_REGISTRY,
+    DB_COMMIT_LATENCY,
+    ACTIVE_SESSIONS,
+    REGISTRY,
+    render,
 )
-from project_alisto.models import SocketData, ThermalEvent, ThermalLimits, SocketDataHistory
+from project_alisto.models import SocketData, ThermalEvent, ThermalEventRow, ThermalLimits
 from project_alisto.mqtt_client import MQTTClient
+from project_alisto.notifications import NotificationDispatcher, stamp_notification
+from project_alisto.store import load_history_buckets
 from rxconfig import config
 
+# How long a session's monitor keeps running after its client disconnects
+# (Reflex does not cancel background tasks), so a quick reconnect keeps it
+MONITOR_DISCONNECT_GRACE_SECONDS = 30.0
+
 
 class State(rx.State):
     """Application state for Project Alisto."""
@@ -28,28 +53,44 @@ class State(rx.State):
     # Socket data (state reflects hardware status)
     sockets: Dict[int, SocketData] = {}
     
-    # Thermal limits (for UI display/reference only)
+    # Default thermal limits (for UI display/reference only)
     thermal_limits: ThermalLimits = ThermalLimits(
         max_temperature=DEFAULT_MAX_TEMPERATURE,
         max_current=DEFAULT_MAX_CURRENT
     )
 
-    @rx.var
-    def thermal_events(self) -> list[ThermalEvent]:
-        """Get all thermal events from the database."""
-        with rx.session() as session:
-            return session.query(ThermalEvent).order_by(
-                ThermalEvent.timestamp.desc()
-            ).limit(50).all()
+    # Effective limits per socket (from limit profiles, via the live state cache)
+    socket_limits: Dict[int, ThermalLimits] = {}
+
+    # Recent thermal events (newest first), from the process-wide live state cache
+    thermal_events: List[ThermalEventRow] = []
+
+    # Live state cache version this session last copied, and the cached
+    # socket objects and event rows it copied then (to copy only what changed)
+    _live_version: int = -1
+    _live_sockets: Dict[int, SocketData] = {}
+    _live_events: List[ThermalEventRow] = []
+
+    # Trend chart points for the socket detail page (at most TREND_POINTS)
+    trend_points: List[dict] = []
+    _trend_socket_id: int = 0
+    _trend_last_ts: float = 0.0
     
-    # MQTT connection status
+    # MQTT connection status (used for control commands only; ingest runs in the worker)
     mqtt_connected: bool = False
     
-    # Thread-safe message queue for MQTT messages
-    message_queue: List[tuple] = []  # List of (topic, payload) tuples
-    
     # MQTT client instance
     _mqtt_client: MQTTClient = None
+
+    # Batches alerts into rate-limited browser notifications for this session
+    _notifications: NotificationDispatcher = None
+
+    # Latest browser notification; the client shows it when its "seq" changes
+    notification: Dict[str, Any] = {}
+    
+    # Socket groups for bulk control, and progress of the last bulk command
+    socket_groups: List[Dict[str, Any]] = []
+    group_command: Dict[str, Any] = {}
     
     # Notification permission status
     notification_permission_granted: bool = False
@@ -69,117 +110,107 @@ class State(rx.State):
 
     def on_load(self):
         """Initialize state on page load."""
-        # Initialize sockets if not already initialized
-        if not self.sockets:
-            for socket_id in range(1, NUM_SOCKETS + 1):
-                self.sockets[socket_id] = SocketData(socket_id=socket_id)
+        self._trend_socket_id = 0
+        self.trend_points = []
+
+        # Hydrate from the last known state (no-op start if already running)
+        LIVE_STATE.start()
+        self._hydrate_from_live_state()
+        self._update_cooling_countdowns()
         
-        # Start background monitoring tasks
+        # Start background monitoring task
         yield self.monitor_cooling()
-        yield self.drain_mqtt_queue()
 
-    def _mqtt_message_handler(self, topic: str, payload: dict):
-        """MQTT message callback (called from background thread)."""
-        # Add message to queue for processing by Reflex event handler
-        self.message_queue.append((topic, payload))
-        # Do NOT call state-mutating handlers here; the queue will be drained by a background event
+    def load_trend(self):
+        """Load the history window, one point per TREND_BUCKET_SECONDS, for the socket detail page's chart."""
+        try:
+            socket_id = int(self.socket_id)
+        except (TypeError, ValueError):
+            return
+        # Buckets are aligned to the live state cache's; the open one is left to the cache
+        open_bucket = time.time() // TREND_BUCKET_SECONDS * TREND_BUCKET_SECONDS
+        points = load_history_buckets(
+            socket_id,
+            since=datetime.fromtimestamp(open_bucket - TREND_POINTS * TREND_BUCKET_SECONDS),
+            bucket_seconds=TREND_BUCKET_SECONDS,
+            until=datetime.fromtimestamp(open_bucket),
+        )
+        self._trend_socket_id = socket_id
+        self._trend_last_ts = points[-1]["ts"] if points else 0.0
+        self.trend_points = points[-TREND_POINTS:]
+        self._append_trend_points()
+
+    def _append_trend_points(self):
+        """Append live points newer than the chart's last point, keeping TREND_POINTS."""
+        new_points = LIVE_STATE.trend_since(self._trend_socket_id, self._trend_last_ts)
+        if new_points:
+            self.trend_points = (self.trend_points + new_points)[-TREND_POINTS:]
+            self._trend_last_ts = new_points[-1]["ts"]
+
+    def _hydrate_from_live_state(self):
+        """Copy what changed from the live state cache, queueing alerts for new shutdowns."""
+        version, sockets, events = LIVE_STATE.snapshot()
+        changed = {
+            socket_id: socket for socket_id, socket in sockets.items()
+            if self._live_sockets.get(socket_id) != socket
+        }
+        if changed:
+            if self._notifications is not None:
+                for socket_id, socket in changed.items():
+                    previous = self.sockets.get(socket_id)
+                    if socket.is_cooling and previous is not None and not previous.is_cooling:
+                        self._notifications.add("THERMAL_SHUTDOWN", socket_id)
+            self.sockets = {**self.sockets, **changed}
+            self._live_sockets = sockets
+        if events != self._live_events:
+            self.thermal_events = events
+            self._live_events = events
+        limits = LIVE_STATE.limits()
+        if limits != self.socket_limits:
+            self.socket_limits = limits
+        groups = LIVE_STATE.groups()
+        if groups != self.socket_groups:
+            self.socket_groups = groups
+        self._live_version = version
+
+    def _update_cooling_countdowns(self):
+        """Refresh the countdown text of sockets whose text changed."""
+        now = time.time()
+        updates = {}
+        for socket_id, socket in self.sockets.items():
+            if socket.is_cooling and socket.cooling_until is not None:
+                remaining = socket.cooling_until - now
+                if remaining <= 0:
+                    formatted = "Ready"
+                else:
+                    minutes = int(remaining // 60)
+                    seconds = int(remaining % 60)
+                    formatted = f"{minutes}:{seconds:02d}"
+            else:
+                formatted = ""
+            if socket.cooling_time_remaining != formatted:
+                updates[socket_id] = replace(socket, cooling_time_remaining=formatted)
+        if updates:
+            self.sockets = {**self.sockets, **updates}
 
     def connect_mqtt(self):
-        """Initialize and connect to MQTT broker."""
+        """Initialize and connect to MQTT broker for sending control commands."""
         if self._mqtt_client is None:
-            self._mqtt_client = MQTTClient(message_callback=self._mqtt_message_handler)
+            self._mqtt_client = MQTTClient()
         
         if not self._mqtt_client.is_connected():
             success = self._mqtt_client.connect()
             if success:
-                # Subscribe to all socket data and status topics
-                for socket_id in range(1, NUM_SOCKETS + 1):
-                    data_topic = MQTT_TOPIC_SOCKET_DATA.format(socket_id=socket_id)
-                    status_topic = MQTT_TOPIC_SOCKET_STATUS.format(socket_id=socket_id)
-                    self._mqtt_client.subscribe(data_topic)
-                self._mqtt_client.subscribe(status_topic)
-
                 # Update connection status after a brief delay
                 yield rx.sleep(0.5)
                 self.mqtt_connected = self._mqtt_client.is_connected()
                 # Ensure background monitoring is running
                 yield self.monitor_cooling()
-                yield self.drain_mqtt_queue()
             else:
                 self.mqtt_connected = False
         else:
             self.mqtt_connected = True
 
-    @rx.event(background=True)
-    async def drain_mqtt_queue(self):
-        """Background task to drain MQTT message queue safely and update state."""
-        while True:
-            async with self:
-                if self.message_queue:
-                    # Swap queues to minimize time under lock
-                    queue_snapshot = self.message_queue[:]
-                    self.message_queue = []
-                else:
-                    queue_snapshot = []
-
-            # Process outside of state lock, but call state handlers within event context
-            for topic, payload in queue_snapshot:
-                # Re-enter state to mutate
-                async with self:
-                    self.handle_mqtt_message(topic, payload)
-
-            await asyncio.sleep(0.1)
-
-    def handle_mqtt_message(self, topic: str, payload: dict):
-        """Process a single MQTT message (Reflex event handler)."""
-        # Extract socket ID from topic
-        match = re.search(r'/socket/(\d+)/', topic)
-        if not match:
-            return
-        
-        socket_id = int(match.group(1))
-        
-        if socket_id not in self.sockets:
-            return
-        
-        # Determine message type based on topic
-        if '/data' in topic:
-            self.process_socket_data(socket_id, payload)
-        elif '/status' in topic:
-            self.process_socket_status(socket_id, payload)
-
-    def process_socket_data(self, socket_id: int, data: dict):
-        """Update socket sensor data from MQTT AND log to DB."""
-        socket = self.sockets[socket_id]
-        socket.temperature = data.get("temperature", socket.temperature)
-        socket.current = data.get("current", socket.current)
-        socket.is_on = data.get("is_on", socket.is_on)
-
-        # NEW: Log this time-series data to the database
-        with rx.session() as session:
-            history_entry = SocketDataHistory(
-                socket_id=socket_id,
-                temperature=socket.temperature,
-                current=socket.current
-            )
-            session.add(history_entry)
-            session.commit()
-
-    def process_socket_status(self, socket_id: int, message: dict):
-        if socket_id not in self.sockets:
-            return
-
-        current_socket = self.sockets[socket_id]
-        updated_socket, new_event = handle_socket_status(current_socket, message)
-
-        self.sockets[socket_id] = updated_socket
-        if new_event:
-            self.add_thermal_event(
-                socket_id=new_event.socket_id,
-                event_type=new_event.event_type,
-                message=new_event.message
-            )
-
     def toggle_socket(self, socket_id: int):
         """Send on/off command via MQTT (hardware enforces cooling period)."""
         if socket_id not in self.sockets:
@@ -210,37 +241,73 @@ class State(rx.State):
                 message=f"Socket {socket_id} manually shut down by user"
             )
 
+    @rx.event(background=True)
+    async def run_group_command(self, group_id: int, command: str):
+        """Send a paced on/off command to every socket in a group that is not already in that state."""
+        async with self:
+            if self.group_command.get("running"):
+                return
+            if not (self._mqtt_client and self._mqtt_client.is_connected()):
+                return
+            group = next((group for group in self.socket_groups if group["id"] == group_id), None)
+            if group is None:
+                return
+            to_send, skipped = plan_bulk_command(self.sockets, group["socket_ids"], command)
+            progress = BulkCommandProgress(
+                group=group["name"],
+                command=command,
+                total=len(group["socket_ids"]),
+                skipped=len(skipped),
+            )
+            self.group_command = progress.as_dict()
+            client = self._mqtt_client
+
+        async def report(progress: BulkCommandProgress):
+            async with self:
+                self.group_command = progress.as_dict()
+
+        turned_off = []
+        try:
+            await execute_bulk_command(
+                progress, to_send, client.publish, report,
+                on_sent=turned_off.append if command == "off" else None,
+            )
+        finally:
+            await asyncio.to_thread(log_manual_shutdowns, turned_off, group["name"])
+
     @rx.event(background=True)
     async def monitor_cooling(self):
-        """Background task to refresh cooling countdown UI and connection status."""
+        """Background task to refresh socket state from the live state cache, cooling countdown UI and connection status."""
         async with self:
             if self.cooling_monitor_running:
                 return
             self.cooling_monitor_running = True
+            if self._notifications is None:
+                self._notifications = NotificationDispatcher()
 
+        token = self.router.session.client_token
+        disconnected_at = None
         try:
             while True:
+                if token in connected_tokens():
+                    disconnected_at = None
+                elif disconnected_at is None:
+                    disconnected_at = time.monotonic()
+                elif time.monotonic() - disconnected_at > MONITOR_DISCONNECT_GRACE_SECONDS:
+                    return
                 async with self:
                     connected = self._mqtt_client.is_connected() if self._mqtt_client else False
                     if self.mqtt_connected != connected:
                         self.mqtt_connected = connected
 
-                    sockets = self.sockets.copy()
-                    for socket_id, socket in sockets.items():
-                        if socket.is_cooling and socket.cooling_until is not None:
-                            remaining = socket.cooling_until - time.time()
-                            if remaining <= 0:
-                                updated_socket = replace(socket, cooling_time_remaining="Ready")
-                            else:
-                                minutes = int(remaining // 60)
-                                seconds = int(remaining % 60)
-                                formatted = f"{minutes}:{seconds:02d}"
-                                updated_socket = replace(socket, cooling_time_remaining=formatted)
-                        else:
-                            updated_socket = replace(socket, cooling_time_remaining="")
-                        sockets[socket_id] = updated_socket
-
-                    self.sockets = sockets
+                    if LIVE_STATE.version != self._live_version:
+                        self._hydrate_from_live_state()
+                        if self._trend_socket_id:
+                            self._append_trend_points()
+                    self._update_cooling_countdowns()
+                    notification = self._notifications.flush()
+                    if notification:
+                        self._deliver_notification(notification)
 
                 await asyncio.sleep(1.5)
         finally:
@@ -256,7 +323,8 @@ class State(rx.State):
                 message=message
             )
             session.add(event)
-            session.commit()
+            with DB_COMMIT_LATENCY.time(table="thermalevent"):
+                session.commit()
 
     def request_notification_permission(self):
         """Request browser notification permission."""
@@ -276,52 +344,31 @@ class State(rx.State):
         # Note: In a real implementation, you might need to poll or use a different approach
         # For now, we'll assume permission is requested and check it when sending notifications
 
+    def _deliver_notification(self, payload: dict):
+        """Hand a notification payload to the client as state (see notifications)."""
+        self.notification = stamp_notification(payload, self.notification.get("seq", 0))
+
     def send_push_notification(self, title: str, body: str):
         """Send browser push notification."""
-        # Escape quotes in title and body for JavaScript
-        title_escaped = title.replace("'", "\\'").replace('"', '\\"').replace('\n', ' ')
-        body_escaped = body.replace("'", "\\'").replace('"', '\\"').replace('\n', ' ')
-        
-        script = f"""
-        if ('Notification' in window && Notification.permission === 'granted') {{
-            new Notification('{title_escaped}', {{
-                body: '{body_escaped}',
-                icon: '/favicon.ico'
-            }});
-        }}
-        """
-        yield rx.call_script(script)
+        self._deliver_notification({"title": title, "body": body, "count": 1})
 
     def get_socket_status_color(self, socket_id: int) -> str:
-        """Get status color for socket based on temperature/current."""
+        """Get status color for socket (precomputed by the live state cache)."""
         if socket_id not in self.sockets:
             return "gray"
-        
-        socket = self.sockets[socket_id]
-        
-        if socket.is_cooling:
-            return "orange"
-        
-        if socket.temperature >= self.thermal_limits.max_temperature * 0.9:
-            return "red"
-        elif socket.temperature >= self.thermal_limits.max_temperature * 0.7:
-            return "yellow"
-        
-        if socket.current >= self.thermal_limits.max_current * 0.9:
-            return "red"
-        elif socket.current >= self.thermal_limits.max_current * 0.7:
-            return "yellow"
-        
-        return "green"
+        return self.sockets[socket_id].status_color
 
 
 def index() -> rx.Component:
     """Main dashboard page."""
     from project_alisto.components.socket_card import socket_card
     from project_alisto.components.thermal_alerts import thermal_alerts
+    from project_alisto.components.group_controls import group_controls
+    from project_alisto.components.notification_listener import notification_listener
     
     return rx.container(
         rx.color_mode.button(position="top-right"),
+        notification_listener(),
         rx.vstack(
             # Header
             rx.hstack(
@@ -390,6 +437,9 @@ def index() -> rx.Component:
                 padding="4",
             ),
             
+            # Group control
+            group_controls(),
+            
             # Socket cards grid
             rx.heading("Socket Status", size="7", margin_top="4"),
             rx.grid(
@@ -416,5 +466,88 @@ def index() -> rx.Component:
     )
 
 
-app = rx.App()
-app.add_page(index)
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Expose the dashboard's metrics in Prometheus text format (ingest metrics are on the worker)."""
+    return PlainTextResponse(render(REGISTRY, DASHBOARD_REGISTRY), media_type=CONTENT_TYPE)
+
+
+async def export_endpoint(request: Request):
+    """
+    Stream socket history or thermal events as CSV or NDJSON.
+
+    Query parameters: socket (repeatable), since and until (ISO 8601) and
+    format ("csv" or "ndjson").
+    """
+    table = request.path_params["table"]
+    fmt = request.query_params.get("format", "csv")
+    if table not in TABLES or fmt not in FORMATS:
+        return PlainTextResponse("Unknown table or format", status_code=404)
+    try:
+        socket_ids = [int(socket_id) for socket_id in request.query_params.getlist("socket")]
+        since = parse_time(request.query_params.get("since"))
+        until = parse_time(request.query_params.get("until"))
+    except ValueError as e:
+        return PlainTextResponse(f"Bad query parameter: {e}", status_code=400)
+    # A sync iterator is consumed in a worker thread, off the event loop
+    return StreamingResponse(
+        stream_export(table, fmt, socket_ids, since, until),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="alisto-{table}.{fmt}"'},
+    )
+
+
+async def profile_endpoint(request: Request):
+    """
+    Start a profiling window of the dashboard process (?seconds=N); requires
+    "Authorization: Bearer <ADMIN_TOKEN>" (see diagnostics.profile_request).
+    """
+    status, payload = profile_request(request.headers.get("authorization", ""), request.query_params)
+    if status == 202:
+        payload["note"] = (
+            "This profiles the dashboard. The ingest handlers run in the worker: "
+            "POST /profile to its metrics port, or send it SIGUSR1, for handler timings."
+        )
+    return JSONResponse(payload, status_code=status)
+
+
+api = Starlette(routes=[
+    Route("/metrics", metrics_endpoint),
+    Route("/export/{table}", export_endpoint),
+    Route("/admin/profile", profile_endpoint, methods=["POST"]),
+])
+
+def socket_detail() -> rx.Component:
+    """Socket detail page with a live trend chart."""
+    from project_alisto.components.notification_listener import notification_listener
+    from project_alisto.components.socket_trend import socket_trend
+
+    return rx.container(
+        rx.color_mode.button(position="top-right"),
+        notification_listener(),
+        socket_trend(),
+        width="100%",
+    )
+
+
+app = rx.App(
+    api_transformer=api,
+    head_components=[rx.script(src="/alisto_notify.js")],
+)
+
+
+def connected_tokens() -> Mapping[str, str]:
+    """Get the client tokens with an open websocket to this backend process."""
+    namespace = app.event_namespace
+    return namespace.token_to_sid if namespace is not None else {}
+
+
+ACTIVE_SESSIONS.set_function(lambda: len(connected_tokens()))
+app.register_lifespan_task(start_live_state)
+app.register_lifespan_task(start_loop_watchdog)
+app.add_page(index, on_load=State.on_load)
+app.add_page(
+    socket_detail,
+    route="/socket/[socket_id]",
+    title="Socket Trend",
+    on_load=[State.on_load, State.load_trend],
+)
@@ -0,0 +1,201 @@
+"""Socket state persistence shared by the ingest worker and the dashboard."""
+
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import reflex as rx
+import sqlalchemy
+import sqlmodel
+
+from project_alisto.models import (
+    SocketData,
+    SocketDataHistory,
+    SocketState,
+    SocketStateVersion,
+    ThermalEvent,
+    ThermalEventRow,
+)
+
+
+# SocketState columns copied from SocketData
+SOCKET_STATE_FIELDS = ("temperature", "current", "is_on", "is_cooling", "cooling_until")
+
+
+def next_state_version(session: sqlmodel.Session) -> int:
+    """
+    Take the next SocketState version (caller commits).
+
+    The counter row is incremented in place, so it stays locked by this
+    transaction until it commits or rolls back: a concurrent writer (another
+    shard) waits, then takes the next version. Versions therefore become
+    visible in increasing order on any database, and a reader polling
+    load_socket_states for rows above the newest version it has seen never
+    skips one. Write history rows before taking it to keep the lock short.
+    """
+    result = session.exec(
+        sqlalchemy.update(SocketStateVersion)
+        .where(SocketStateVersion.id == 1)
+        .values(version=SocketStateVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        # First write: start above any version stored before the counter existed
+        newest = sqlmodel.func.coalesce(sqlmodel.func.max(SocketState.version), 0)
+        session.exec(sqlalchemy.insert(SocketStateVersion).from_select(
+            ["id", "version"], sqlmodel.select(sqlalchemy.literal(1), newest + 1)
+        ))
+    return session.exec(sqlmodel.select(SocketStateVersion.version).where(SocketStateVersion.id == 1)).one()
+
+
+def save_socket_state(
+        session: sqlmodel.Session,
+        socket: SocketData,
+        fields: Optional[Iterable[str]] = None,
+        version: Optional[int] = None,
+):
+    """
+    Insert or update the stored state of a socket (caller commits).
+
+    Args:
+        session: Session to write in
+        socket: State to store
+        fields: Columns to update in an existing row (all if None); a writer
+            only updates what it changed, so it never overwrites other
+            columns with a stale in-memory copy
+        version: Version from next_state_version (taken here if None); a
+            transaction writing several sockets takes one for all of them
+    """
+    if version is None:
+        version = next_state_version(session)
+    fields = SOCKET_STATE_FIELDS if fields is None else tuple(fields)
+    values = {field: getattr(socket, field) for field in fields}
+    result = session.exec(
+        sqlalchemy.update(SocketState)
+        .where(SocketState.socket_id == socket.socket_id)
+        .values(**values, updated_at=datetime.now(), version=version)
+    )
+    if result.rowcount == 0:
+        session.exec(sqlalchemy.insert(SocketState).values(
+            socket_id=socket.socket_id,
+            updated_at=datetime.now(),
+            version=version,
+            **{field: getattr(socket, field) for field in SOCKET_STATE_FIELDS},
+        ))
+
+
+def _socket_data(row) -> SocketData:
+    return SocketData(
+        socket_id=row.socket_id,
+        temperature=row.temperature,
+        current=row.current,
+        is_on=getattr(row, "is_on", False),
+        is_cooling=getattr(row, "is_cooling", False),
+        cooling_until=getattr(row, "cooling_until", None),
+    )
+
+
+def load_socket_states(after_version: Optional[int] = None) -> Tuple[Dict[int, SocketData], Optional[int]]:
+    """
+    Load stored socket states, keyed by socket ID.
+
+    Args:
+        after_version: Only load states written after this version
+
+    Returns:
+        The states and the newest version among them (pass it back as
+        after_version to load only what changed)
+    """
+    query = sqlmodel.select(SocketState)
+    if after_version is not None:
+        query = query.where(SocketState.version > after_version)
+    states = {}
+    newest = after_version
+    with rx.session() as session:
+        for row in session.exec(query):
+            states[row.socket_id] = _socket_data(row)
+            if newest is None or row.version > newest:
+                newest = row.version
+    return states, newest
+
+
+def load_latest_history(socket_ids: Iterable[int]) -> Dict[int, SocketData]:
+    """Load the newest SocketDataHistory reading per socket."""
+    socket_ids = list(socket_ids)
+    if not socket_ids:
+        return {}
+    newest_ids = (
+        sqlmodel.select(sqlmodel.func.max(SocketDataHistory.id))
+        .where(SocketDataHistory.socket_id.in_(socket_ids))
+        .group_by(SocketDataHistory.socket_id)
+    )
+    query = sqlmodel.select(SocketDataHistory).where(SocketDataHistory.id.in_(newest_ids))
+    with rx.session() as session:
+        return {row.socket_id: _socket_data(row) for row in session.exec(query)}
+
+
+def load_recent_events(limit: int = 50) -> List[ThermalEvent]:
+    """Load the most recent thermal events, newest first."""
+    query = sqlmodel.select(ThermalEvent).order_by(ThermalEvent.timestamp.desc()).limit(limit)
+    with rx.session() as session:
+        return list(session.exec(query))
+
+
+def thermal_event_row(event: ThermalEvent) -> ThermalEventRow:
+    """Build the dashboard row of a thermal event."""
+    return ThermalEventRow(
+        id=event.id,
+        socket_id=event.socket_id,
+        event_type=event.event_type,
+        message=event.message,
+        formatted_timestamp=event.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        repeat_count=event.repeat_count,
+    )
+
+
+def trend_point(timestamp: float, temperature: float, current: float) -> dict:
+    """Build a trend chart point."""
+    return {
+        "ts": timestamp,
+        "time": time.strftime("%H:%M:%S", time.localtime(timestamp)),
+        "temperature": round(temperature, 2),
+        "current": round(current, 3),
+    }
+
+
+def load_history_buckets(
+        socket_id: int, since: datetime, bucket_seconds: float, until: Optional[datetime] = None
+) -> List[dict]:
+    """
+    Load a socket's history since a time (until a time, exclusive), averaged
+    into fixed-width buckets starting at since.
+    Rows are streamed, so memory depends on the number of buckets only.
+    """
+    query = (
+        sqlmodel.select(SocketDataHistory.timestamp, SocketDataHistory.temperature, SocketDataHistory.current)
+        .where(SocketDataHistory.socket_id == socket_id, SocketDataHistory.timestamp >= since)
+        .order_by(SocketDataHistory.timestamp)
+        .execution_options(yield_per=1000)
+    )
+    if until is not None:
+        query = query.where(SocketDataHistory.timestamp < until)
+    start = since.timestamp()
+    points = []
+    bucket = None
+    count = temperature_sum = current_sum = 0.0
+    with rx.session() as session:
+        for timestamp, temperature, current in session.exec(query):
+            index = int((timestamp.timestamp() - start) // bucket_seconds)
+            if index != bucket and count:
+                points.append(trend_point(
+                    start + (bucket + 0.5) * bucket_seconds, temperature_sum / count, current_sum / count
+                ))
+                count = temperature_sum = current_sum = 0.0
+            bucket = index
+            count += 1
+            temperature_sum += temperature
+            current_sum += current
+    if count:
+        points.append(trend_point(
+            start + (bucket + 0.5) * bucket_seconds, temperature_sum / count, current_sum / count
+        ))
+    return points
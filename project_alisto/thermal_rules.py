@@ -0,0 +1,262 @@
+"""Thermal limit profiles and batch status evaluation for Project Alisto.
+
+Limits come from ThermalLimitProfile rows: a socket's own profile wins,
+then the tightest profile of any group it belongs to, then the defaults.
+All sockets are classified at once over aligned NumPy arrays. A socket's
+load is the larger of temperature/max_temperature and current/max_current;
+it enters the warning level at WARN_RATIO and the critical level at
+CRITICAL_RATIO, and only drops back a level once the load falls
+THERMAL_HYSTERESIS_RATIO below that level's threshold, so readings hovering
+around a threshold do not make the status flicker.
+
+Usage:
+    python -m project_alisto.thermal_rules set --socket 3 --max-temperature 50
+    python -m project_alisto.thermal_rules set --group zone-a --max-current 10
+    python -m project_alisto.thermal_rules list
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import reflex as rx
+import sqlmodel
+
+from project_alisto.config import DEFAULT_MAX_CURRENT, DEFAULT_MAX_TEMPERATURE, THERMAL_HYSTERESIS_RATIO
+from project_alisto.models import SocketData, SocketGroup, SocketGroupMember, ThermalLimitProfile, ThermalLimits
+
+logger = logging.getLogger(__name__)
+
+# Fractions of a limit at which a socket enters the warning and critical levels
+WARN_RATIO = 0.7
+CRITICAL_RATIO = 0.9
+
+# Badge color per level (0 = normal, 1 = warning, 2 = critical)
+LEVEL_COLORS = ("green", "yellow", "red")
+COOLING_COLOR = "orange"
+OFF_COLOR = "gray"
+
+
+def default_limits() -> ThermalLimits:
+    return ThermalLimits(max_temperature=DEFAULT_MAX_TEMPERATURE, max_current=DEFAULT_MAX_CURRENT)
+
+
+def resolve_limits(
+        socket_ids: Iterable[int],
+        profiles: List[ThermalLimitProfile],
+        group_members: Dict[int, List[int]],
+) -> Dict[int, ThermalLimits]:
+    """
+    Resolve the effective limits of each socket.
+
+    Args:
+        socket_ids: Sockets to resolve
+        profiles: All limit profiles
+        group_members: Socket IDs per group ID
+
+    Returns:
+        Limits per socket: its own profile, else the tightest of its groups'
+        profiles (per limit), else the defaults
+    """
+    socket_profiles = {profile.socket_id: profile for profile in profiles if profile.socket_id is not None}
+    group_limits: Dict[int, ThermalLimits] = {}
+    for profile in profiles:
+        if profile.group_id is None:
+            continue
+        for socket_id in group_members.get(profile.group_id, []):
+            limits = group_limits.get(socket_id)
+            if limits is None:
+                group_limits[socket_id] = ThermalLimits(profile.max_temperature, profile.max_current)
+            else:
+                limits.max_temperature = min(limits.max_temperature, profile.max_temperature)
+                limits.max_current = min(limits.max_current, profile.max_current)
+
+    resolved = {}
+    for socket_id in socket_ids:
+        profile = socket_profiles.get(socket_id)
+        if profile is not None:
+            resolved[socket_id] = ThermalLimits(profile.max_temperature, profile.max_current)
+        else:
+            resolved[socket_id] = group_limits.get(socket_id) or default_limits()
+    return resolved
+
+
+class ThermalRuleEvaluator:
+    """Classifies a fixed set of sockets in one batch, remembering levels for hysteresis."""
+
+    def __init__(self, socket_ids: Iterable[int], hysteresis: float = THERMAL_HYSTERESIS_RATIO):
+        self.socket_ids = sorted(socket_ids)
+        self.hysteresis = hysteresis
+        self._index = {socket_id: index for index, socket_id in enumerate(self.socket_ids)}
+        size = len(self.socket_ids)
+        self._max_temperature = np.full(size, DEFAULT_MAX_TEMPERATURE)
+        self._max_current = np.full(size, DEFAULT_MAX_CURRENT)
+        self._levels = np.zeros(size, dtype=np.int8)
+
+    def set_limits(self, limits: Dict[int, ThermalLimits]) -> bool:
+        """Set per-socket limits (missing sockets keep theirs); returns True if any changed."""
+        max_temperature = self._max_temperature.copy()
+        max_current = self._max_current.copy()
+        for socket_id, socket_limits in limits.items():
+            index = self._index.get(socket_id)
+            if index is not None:
+                max_temperature[index] = socket_limits.max_temperature
+                max_current[index] = socket_limits.max_current
+        if np.array_equal(max_temperature, self._max_temperature) and np.array_equal(max_current, self._max_current):
+            return False
+        self._max_temperature, self._max_current = max_temperature, max_current
+        return True
+
+    def limits(self) -> Dict[int, ThermalLimits]:
+        """Get the current limits per socket."""
+        return {
+            socket_id: ThermalLimits(float(self._max_temperature[index]), float(self._max_current[index]))
+            for socket_id, index in self._index.items()
+        }
+
+    def evaluate(self, sockets: Dict[int, SocketData]) -> Dict[int, str]:
+        """
+        Classify every socket and get its badge color.
+
+        Args:
+            sockets: Latest state of every socket the evaluator knows
+
+        Returns:
+            Badge color per socket ID
+        """
+        size = len(self.socket_ids)
+        temperature = np.empty(size)
+        current = np.empty(size)
+        is_on = np.empty(size, dtype=bool)
+        is_cooling = np.empty(size, dtype=bool)
+        for index, socket_id in enumerate(self.socket_ids):
+            socket = sockets[socket_id]
+            temperature[index] = socket.temperature
+            current[index] = socket.current
+            is_on[index] = socket.is_on
+            is_cooling[index] = socket.is_cooling
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            load = np.fmax(temperature / self._max_temperature, current / self._max_current)
+        raised = (load >= WARN_RATIO).astype(np.int8) + (load >= CRITICAL_RATIO)
+        held = (load >= WARN_RATIO - self.hysteresis).astype(np.int8) + (load >= CRITICAL_RATIO - self.hysteresis)
+        # Go up as soon as a threshold is crossed; come down only below the lowered thresholds
+        levels = np.maximum(raised, np.minimum(self._levels, held))
+        # A socket that is off or cooling starts over from normal
+        levels[~is_on | is_cooling] = 0
+        self._levels = levels
+
+        colors = np.asarray(LEVEL_COLORS, dtype=object)[levels]
+        colors[~is_on] = OFF_COLOR
+        colors[is_cooling] = COOLING_COLOR
+        return dict(zip(self.socket_ids, colors.tolist()))
+
+
+def load_socket_limits(
+        socket_ids: Iterable[int], group_members: Optional[Dict[int, List[int]]] = None
+) -> Dict[int, ThermalLimits]:
+    """
+    Load profiles and resolve each socket's limits.
+
+    Args:
+        socket_ids: Sockets to resolve
+        group_members: Socket IDs per group ID if the caller already has
+            them (loaded here, when a group profile needs them, otherwise)
+    """
+    with rx.session() as session:
+        profiles = session.exec(sqlmodel.select(ThermalLimitProfile)).all()
+        if group_members is None:
+            group_members = {}
+            if any(profile.group_id is not None for profile in profiles):
+                for member in session.exec(sqlmodel.select(SocketGroupMember)):
+                    group_members.setdefault(member.group_id, []).append(member.socket_id)
+    return resolve_limits(socket_ids, profiles, group_members)
+
+
+def save_limit_profile(
+        max_temperature: float,
+        max_current: float,
+        socket_id: Optional[int] = None,
+        group_id: Optional[int] = None,
+):
+    """Create or replace the limit profile of one socket or one group."""
+    if (socket_id is None) == (group_id is None):
+        raise ValueError("Exactly one of socket_id and group_id is required")
+    # A limit of zero or below would divide every reading into an infinite or negative load
+    for name, limit in (("max_temperature", max_temperature), ("max_current", max_current)):
+        if not (math.isfinite(limit) and limit > 0):
+            raise ValueError(f"{name} must be a positive number, got {limit}")
+    with rx.session() as session:
+        column = ThermalLimitProfile.socket_id if socket_id is not None else ThermalLimitProfile.group_id
+        profile = session.exec(
+            sqlmodel.select(ThermalLimitProfile).where(column == (socket_id if socket_id is not None else group_id))
+        ).first()
+        if profile is None:
+            profile = ThermalLimitProfile(socket_id=socket_id, group_id=group_id)
+        profile.max_temperature = max_temperature
+        profile.max_current = max_current
+        session.add(profile)
+        session.commit()
+
+
+def _positive_float(value: str) -> float:
+    """Parse a limit given on the command line."""
+    try:
+        limit = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if not (math.isfinite(limit) and limit > 0):
+        raise argparse.ArgumentTypeError(f"must be a positive number: {value!r}")
+    return limit
+
+
+def _set(args: argparse.Namespace) -> int:
+    group_id = None
+    if args.group is not None:
+        with rx.session() as session:
+            group = session.exec(sqlmodel.select(SocketGroup).where(SocketGroup.name == args.group)).first()
+        if group is None:
+            print(f"No group named {args.group}")
+            return 1
+        group_id = group.id
+    save_limit_profile(args.max_temperature, args.max_current, socket_id=args.socket, group_id=group_id)
+    return 0
+
+
+def _list(args: argparse.Namespace) -> int:
+    with rx.session() as session:
+        groups = {group.id: group.name for group in session.exec(sqlmodel.select(SocketGroup))}
+        profiles = session.exec(sqlmodel.select(ThermalLimitProfile)).all()
+    for profile in profiles:
+        target = f"socket {profile.socket_id}" if profile.socket_id is not None else f"group {groups.get(profile.group_id)}"
+        print(f"{target}: {profile.max_temperature:.1f}°C, {profile.max_current:.1f}A")
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Manage per-socket and per-group thermal limits.")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    set_parser = subparsers.add_parser("set", help="Create or replace a limit profile")
+    target = set_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--socket", type=int, help="Socket ID")
+    target.add_argument("--group", help="Group name")
+    set_parser.add_argument("--max-temperature", type=_positive_float, default=DEFAULT_MAX_TEMPERATURE, help="Celsius")
+    set_parser.add_argument("--max-current", type=_positive_float, default=DEFAULT_MAX_CURRENT, help="Amperes")
+    set_parser.set_defaults(func=_set)
+
+    list_parser = subparsers.add_parser("list", help="List limit profiles")
+    list_parser.set_defaults(func=_list)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""Standalone ingest worker for Project Alisto.
+
+Subscribes to socket data and status topics and runs the ingest pipeline
+(decode, route, history writes, thermal event logging) without starting or
+compiling the Reflex frontend. The dashboard reads what this worker stores.
+
+Ingest can be split across processes. Each worker owns the sockets where
+socket_id % shard_count == shard_index and subscribes only to their topics,
+so every socket (both its data and status topics) is handled by exactly one
+process, in order. MQTT shared subscriptions are deliberately not used: they
+would spread one socket's data and status messages over different workers.
+
+Each worker writes in batches (see project_alisto.ingest). Sharding spreads
+decoding and handling over processes, but SQLite (the default database)
+admits one writer at a time, so shards add no write throughput there; the
+write path scales with shards only on a server database such as PostgreSQL.
+
+Usage:
+    python -m project_alisto.worker
+    python -m project_alisto.worker --shards 4
+    python -m project_alisto.worker --shard-count 4 --shard-index 2
+    python -m project_alisto.worker --replay capture.bin --speed 10
+    python -m project_alisto.worker --replay capture.bin --max-speed --profile 60
+
+Startup subscribes before the ingest pipeline exists: importing it (SQLModel
+and the tables) takes about a second, so it is built on a background thread
+and the messages received meanwhile are handed to it in order (see
+PipelineLoader).
+
+Send SIGUSR1 to a running worker to profile it for PROFILE_WINDOW_SECONDS, or,
+with ADMIN_TOKEN set, POST /profile?seconds=N to its metrics port (see
+project_alisto.diagnostics).
+"""
+
+import argparse
+import logging
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Tuple
+
+from project_alisto.config import (
+    INGEST_METRICS_PORT,
+    INGEST_SHARD_COUNT,
+    INGEST_SHARD_INDEX,
+    MQTT_CLIENT_ID,
+    MQTT_CONNECT_RETRY_MAX_SECONDS,
+    MQTT_TOPIC_ALL_SOCKET_DATA,
+    MQTT_TOPIC_ALL_SOCKET_STATUS,
+    MQTT_TOPIC_SOCKET_DATA,
+    MQTT_TOPIC_SOCKET_STATUS,
+    NUM_SOCKETS,
+)
+from project_alisto.diagnostics import PROFILER, install_profile_signal, profile_request
+from project_alisto.metrics import start_http_server
+from project_alisto.mqtt_client import MQTTClient
+
+if TYPE_CHECKING:
+    from project_alisto.ingest import IngestPipeline
+
+logger = logging.getLogger(__name__)
+
+
+def socket_shard(socket_id: int, shard_count: int) -> int:
+    """
+    Get the ingest shard that owns a socket. Every message for a socket
+    goes to the same shard, which preserves per-socket ordering.
+    """
+    return socket_id % shard_count
+
+
+def shard_socket_ids(shard_index: int, shard_count: int) -> List[int]:
+    """Get the socket IDs owned by a shard."""
+    return [
+        socket_id for socket_id in range(1, NUM_SOCKETS + 1)
+        if socket_shard(socket_id, shard_count) == shard_index
+    ]
+
+
+def subscription_topics(shard_index: int, shard_count: int) -> List[str]:
+    """Get the topics a worker subscribes to."""
+    if shard_count == 1:
+        return [MQTT_TOPIC_ALL_SOCKET_DATA, MQTT_TOPIC_ALL_SOCKET_STATUS]
+    topics = []
+    for socket_id in shard_socket_ids(shard_index, shard_count):
+        topics.append(MQTT_TOPIC_SOCKET_DATA.format(socket_id=socket_id))
+        topics.append(MQTT_TOPIC_SOCKET_STATUS.format(socket_id=socket_id))
+    return topics
+
+
+class PipelineLoader:
+    """Builds the ingest pipeline, holding the messages received until it has started."""
+
+    def __init__(self, socket_ids: Iterable[int]):
+        """
+        Initialize the loader.
+
+        Args:
+            socket_ids: Sockets the pipeline accepts messages for
+        """
+        self.socket_ids = list(socket_ids)
+        self.pipeline: Optional["IngestPipeline"] = None
+        self._held: List[Tuple[str, dict, float]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, topic: str, payload: dict):
+        """Pass a decoded MQTT message to the pipeline, or hold it until the pipeline has started."""
+        pipeline = self.pipeline
+        if pipeline is None:
+            with self._lock:
+                pipeline = self.pipeline
+                if pipeline is None:
+                    self._held.append((topic, payload, time.time()))
+                    return
+        pipeline.submit(topic, payload)
+
+    def load(self) -> "IngestPipeline":
+        """Build and start the pipeline, then hand it the held messages in order."""
+        # Imports SQLModel and the tables, which dominates worker startup
+        from project_alisto.ingest import IngestPipeline
+
+        pipeline = IngestPipeline(self.socket_ids)
+        pipeline.start()
+        with self._lock:
+            for topic, payload, received_at in self._held:
+                pipeline.submit(topic, payload, received_at)
+            self._held = []
+            self.pipeline = pipeline
+        logger.info("Ingest pipeline started")
+        return pipeline
+
+    def start(self, on_error: Callable[[], None]):
+        """Load the pipeline on a background thread, calling on_error if that fails."""
+        def load():
+            try:
+                self.load()
+            except Exception:
+                logger.exception("Failed to start the ingest pipeline")
+                on_error()
+
+        self._thread = threading.Thread(target=load, name="alisto-ingest-load", daemon=True)
+        self._thread.start()
+
+    def wait(self) -> Optional["IngestPipeline"]:
+        """Wait for a background load to finish and get the pipeline (None if it failed)."""
+        if self._thread is not None:
+            self._thread.join()
+        return self.pipeline
+
+
+def connect_with_retry(
+        client: MQTTClient, stop: threading.Event, max_delay: float = MQTT_CONNECT_RETRY_MAX_SECONDS
+) -> bool:
+    """
+    Connect, retrying with exponential backoff until connected or stopped.
+
+    Returns:
+        True once connected, False if stopped first
+    """
+    delay = 1.0
+    while not client.connect():
+        logger.warning(f"Retrying MQTT connection in {delay:.0f}s")
+        if stop.wait(delay):
+            return False
+        delay = min(delay * 2, max_delay)
+    return True
+
+
+def run_live(loader: PipelineLoader, client_id: str, topics: List[str]) -> int:
+    """Ingest from the MQTT broker until SIGINT/SIGTERM, subscribing while the pipeline loads."""
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    loader.start(on_error=stop.set)
+
+    # The broker may start after the worker; paho reconnects by itself once connected
+    client = MQTTClient(message_callback=loader.submit, client_id=client_id)
+    if connect_with_retry(client, stop):
+        for topic in topics:
+            client.subscribe(topic)
+        stop.wait()
+
+    logger.info("Stopping ingest worker")
+    client.disconnect()
+    pipeline = loader.wait()
+    if pipeline is None:
+        return 1
+    pipeline.stop()
+    return 0
+
+
+def run_replay(pipeline: "IngestPipeline", path: str, speed: Optional[float]) -> int:
+    """Ingest a capture file instead of the live broker."""
+    from project_alisto.capture import replay
+
+    # Never connected; only used for its decode path
+    client = MQTTClient(message_callback=pipeline.submit, client_id=f"{MQTT_CLIENT_ID}-replay")
+    started = time.monotonic()
+    count = replay(path, client.dispatch_raw, speed=speed)
+    pipeline.stop()
+    elapsed = time.monotonic() - started
+    logger.info(f"Ingested {count} messages in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} msg/s)")
+    return 0
+
+
+def run_shards(args: argparse.Namespace) -> int:
+    """Run one worker process per shard and wait for them to exit, forwarding signals to them."""
+    processes = []
+
+    def forward(signum, frame):
+        for process in processes:
+            process.send_signal(signum)
+
+    # Installed before starting the shards so that no signal kills this process and orphans them
+    signal.signal(signal.SIGINT, lambda signum, frame: forward(signal.SIGTERM, frame))
+    signal.signal(signal.SIGTERM, forward)
+    if hasattr(signal, "SIGUSR1"):
+        # Profiling requests go to every shard (see diagnostics)
+        signal.signal(signal.SIGUSR1, forward)
+
+    for shard_index in range(args.shards):
+        command = [
+            sys.executable, "-m", "project_alisto.worker",
+            "--shard-count", str(args.shards),
+            "--shard-index", str(shard_index),
+        ]
+        if args.metrics_port:
+            command += ["--metrics-port", str(args.metrics_port + shard_index)]
+        if args.replay:
+            command += ["--replay", args.replay, "--speed", str(args.speed)]
+        if args.max_speed:
+            command.append("--max-speed")
+        if args.profile:
+            command += ["--profile", str(args.profile)]
+        processes.append(subprocess.Popen(command))
+    return max(process.wait() for process in processes)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run the Alisto MQTT ingest worker.")
+    parser.add_argument("--metrics-port", type=int, default=INGEST_METRICS_PORT,
+                        help="Serve /metrics on this port (0 disables)")
+    parser.add_argument("--replay", metavar="PATH", help="Ingest a capture file instead of the broker")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--max-speed", action="store_true", help="Replay without pacing")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Run this many shard worker processes")
+    parser.add_argument("--shard-count", type=int, default=INGEST_SHARD_COUNT,
+                        help="Total number of shards")
+    parser.add_argument("--shard-index", type=int, default=INGEST_SHARD_INDEX,
+                        help="Shard owned by this worker (0-based)")
+    parser.add_argument("--profile", type=float, default=0, metavar="SECONDS",
+                        help="Profile handlers for this many seconds from startup")
+    args = parser.parse_args(argv)
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1")
+    if not (math.isfinite(args.profile) and args.profile >= 0):
+        parser.error("--profile must be a non-negative number of seconds")
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if args.shards > 1:
+        return run_shards(args)
+
+    if args.metrics_port:
+        start_http_server(args.metrics_port, post_routes={"/profile": profile_request})
+        logger.info(f"Serving metrics on :{args.metrics_port}/metrics")
+
+    loader = PipelineLoader(shard_socket_ids(args.shard_index, args.shard_count))
+    install_profile_signal()
+    if args.profile:
+        PROFILER.start(args.profile)
+    try:
+        if args.replay:
+            return run_replay(loader.load(), args.replay, None if args.max_speed else args.speed)
+
+        client_id = f"{MQTT_CLIENT_ID}-ingest"
+        if args.shard_count > 1:
+            client_id = f"{client_id}-{args.shard_index}"
+        logger.info(f"Starting ingest shard {args.shard_index + 1}/{args.shard_count}")
+        return run_live(loader, client_id, subscription_topics(args.shard_index, args.shard_count))
+    finally:
+        # Write any open profiling window before exiting
+        PROFILER.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
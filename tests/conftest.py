@@ -0,0 +1,13 @@
+import pytest
+import reflex as rx
+import sqlmodel
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point rx.session() at a fresh SQLite database with every table created."""
+    engine = sqlmodel.create_engine(f"sqlite:///{tmp_path / 'alisto.db'}")
+    sqlmodel.SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(rx, "session", lambda: sqlmodel.Session(engine))
+    yield engine
+    engine.dispose()
@@ -0,0 +1,50 @@
+from project_alisto.capture import CaptureWriter, capture_path, read_capture, replay
+
+
+def test_capture_round_trip(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    writer.record("alisto/socket/1/data", b'{"temperature": 31.5}', received_at=100.0)
+    writer.record("alisto/socket/2/status", b'{"status": "NORMAL"}', received_at=100.5)
+    writer.close()
+
+    records = list(read_capture(path))
+
+    assert [r.topic for r in records] == ["alisto/socket/1/data", "alisto/socket/2/status"]
+    assert records[0].payload == b'{"temperature": 31.5}'
+    assert records[1].received_at == 100.5
+
+
+def test_replay_at_max_speed(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path)
+    for i in range(5):
+        writer.record(f"alisto/socket/{i}/data", b"{}", received_at=1000.0 + i * 60)
+    writer.close()
+    received = []
+
+    count = replay(path, lambda topic, payload: received.append(topic), speed=None)
+
+    assert count == 5
+    assert received[0] == "alisto/socket/0/data"
+
+
+def test_records_are_written_without_close(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    writer = CaptureWriter(path, flush_records=2, flush_seconds=0)
+    writer.record("alisto/socket/1/data", b"{}", received_at=1.0)
+    assert list(read_capture(path)) == []
+
+    writer.record("alisto/socket/2/data", b"{}", received_at=2.0)
+    writer.record("alisto/socket/3/data", b"{}", received_at=3.0)
+
+    # Only whole records, in batches of flush_records
+    assert [r.topic for r in read_capture(path)] == ["alisto/socket/1/data", "alisto/socket/2/data"]
+    writer.flush()
+    assert len(list(read_capture(path))) == 3
+    writer.close()
+
+
+def test_capture_path_is_per_process():
+    assert capture_path("/data/capture.bin", pid=42) == "/data/capture-42.bin"
+    assert capture_path("capture", pid=7) == "capture-7"
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+
+from project_alisto import diagnostics
+from project_alisto.diagnostics import HandlerProfiler, LoopLagWatchdog, profile_request, profiled
+
+
+def blocking_call():
+    time.sleep(0.4)
+
+
+def test_watchdog_logs_the_blocking_stack(caplog):
+    watchdog = LoopLagWatchdog(threshold_seconds=0.1, interval_seconds=0.05)
+
+    async def main():
+        task = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.1)
+        blocking_call()
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    with caplog.at_level(logging.WARNING, logger="project_alisto.diagnostics"):
+        asyncio.run(main())
+
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1
+    assert "blocking_call" in warnings[0]
+
+
+def test_watchdog_check_ignores_short_delays():
+    watchdog = LoopLagWatchdog(threshold_seconds=0.25, interval_seconds=0.1)
+    beat = time.monotonic()
+    watchdog._beat = beat
+
+    assert watchdog.check(now=beat + 0.3) is None
+    assert round(watchdog.check(now=beat + 0.6), 3) == 0.5
+
+
+def test_profiled_handlers_are_timed_only_during_a_window(tmp_path, monkeypatch):
+    profiler = HandlerProfiler(sample_interval_seconds=0.005)
+    monkeypatch.setattr("project_alisto.diagnostics.PROFILER", profiler)
+
+    @profiled("work")
+    def work():
+        time.sleep(0.01)
+        return 1
+
+    assert work() == 1
+    assert profiler.start(seconds=5, output_dir=str(tmp_path))
+    assert not profiler.start(seconds=5, output_dir=str(tmp_path))
+    for _ in range(3):
+        work()
+    path = profiler.stop()
+
+    assert not profiler.active
+    report = json.loads(open(path).read())
+    assert report["handlers"]["work"]["count"] == 3
+    assert report["samples"] > 0
+    assert any("work (" in stack for stack in report["stacks"])
+
+
+def test_profile_request_checks_the_token_and_window(monkeypatch, tmp_path):
+    profiler = HandlerProfiler(sample_interval_seconds=0.01)
+    profiler.start = functools.partial(HandlerProfiler.start, profiler, output_dir=str(tmp_path))
+    monkeypatch.setattr(diagnostics, "PROFILER", profiler)
+    monkeypatch.setattr(diagnostics, "ADMIN_TOKEN", "secret")
+    token = "Bearer secret"
+
+    assert profile_request("Bearer wrong", {})[0] == 403
+    for seconds in ("inf", "nan", "-1", "0", "100000", "soon"):
+        assert profile_request(token, {"seconds": seconds})[0] == 400
+    assert not profiler.active
+
+    status, payload = profile_request(token, {"seconds": "0.2"})
+    assert (status, payload["started"]) == (202, True)
+    assert profile_request(token, {"seconds": "0.2"})[0] == 409
+    profiler.stop()
@@ -0,0 +1,69 @@
+import sqlmodel
+
+from project_alisto.event_log import EventDeduplicator, ThermalEventLogger
+from project_alisto.models import ThermalEvent
+
+
+def test_repeats_within_window_are_collapsed():
+    dedup = EventDeduplicator(window_seconds=60.0)
+    assert dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=500.0, now=0.0) is True
+    for second in range(1, 50):
+        assert dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=500.0, now=float(second)) is False
+
+    batch = dedup.take_dirty(now=50.0)
+
+    assert len(batch) == 1
+    assert batch[0].repeat_count == 50
+
+
+def test_new_cooling_period_is_a_new_event():
+    dedup = EventDeduplicator(window_seconds=60.0)
+    dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=500.0, now=0.0)
+    dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=900.0, now=1.0)
+    dedup.record(2, "THERMAL_SHUTDOWN", cooling_until=500.0, now=1.0)
+
+    assert len(dedup.take_dirty(now=2.0)) == 3
+
+
+def test_repeat_after_write_marks_row_for_update():
+    dedup = EventDeduplicator(window_seconds=60.0)
+    dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=500.0, now=0.0)
+    event = dedup.take_dirty(now=0.5)[0]
+    event.row_id = 10
+
+    dedup.record(1, "THERMAL_SHUTDOWN", cooling_until=500.0, now=5.0)
+    batch = dedup.take_dirty(now=6.0)
+
+    assert batch == [event]
+    assert event.repeat_count == 2
+    assert dedup.take_dirty(now=100.0) == []
+
+
+def _stored_events(engine):
+    with sqlmodel.Session(engine) as session:
+        return session.exec(sqlmodel.select(ThermalEvent)).all()
+
+
+def test_logger_inserts_once_then_updates_repeat_count(db):
+    logger = ThermalEventLogger(window_seconds=60.0)
+    logger.log(1, "THERMAL_SHUTDOWN", "Socket 1 auto-shutdown.", cooling_until=500.0)
+    logger.log(1, "THERMAL_SHUTDOWN", "Socket 1 auto-shutdown.", cooling_until=500.0)
+    logger.flush()
+    assert [event.repeat_count for event in _stored_events(db)] == [2]
+
+    logger.log(1, "THERMAL_SHUTDOWN", "Socket 1 auto-shutdown.", cooling_until=500.0)
+    logger.flush()
+
+    events = _stored_events(db)
+    assert len(events) == 1
+    assert events[0].repeat_count == 3
+
+
+def test_logger_flushes_pending_events_on_stop(db):
+    logger = ThermalEventLogger(flush_interval_seconds=3600.0)
+    logger.start()
+    logger.log(2, "THERMAL_SHUTDOWN", cooling_until=900.0)
+
+    logger.stop(timeout=5.0)
+
+    assert [(event.socket_id, event.cooling_until) for event in _stored_events(db)] == [(2, 900.0)]
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime, timezone
+
+import sqlmodel
+from starlette.testclient import TestClient
+
+from project_alisto.export import encode_rows, export_rows, parse_time
+from project_alisto.models import SocketDataHistory
+from project_alisto.project_alisto import api
+
+COLUMNS = ("id", "socket_id", "timestamp", "temperature")
+ROWS = [(i, 1, datetime(2026, 1, 1, 12, 0, i), 20.0 + i) for i in range(5)]
+
+
+def test_csv_has_header_and_is_chunked():
+    chunks = list(encode_rows(iter(ROWS), COLUMNS, "csv", chunk_rows=2))
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "id,socket_id,timestamp,temperature"
+    assert lines[1] == "0,1,2026-01-01T12:00:00,20.0"
+    assert len(lines) == 6
+
+
+def test_ndjson_is_one_object_per_line():
+    lines = "".join(encode_rows(iter(ROWS), COLUMNS, "ndjson")).splitlines()
+
+    assert len(lines) == 5
+    assert json.loads(lines[4]) == {"id": 4, "socket_id": 1, "timestamp": "2026-01-01T12:00:04", "temperature": 24.0}
+
+
+def test_empty_export_yields_only_header():
+    assert list(encode_rows(iter([]), COLUMNS, "csv")) == ["id,socket_id,timestamp,temperature\n"]
+    assert list(encode_rows(iter([]), COLUMNS, "ndjson")) == []
+
+
+def add_history(engine):
+    with sqlmodel.Session(engine) as session:
+        for i in range(4):
+            session.add(SocketDataHistory(
+                socket_id=1 + i % 2, temperature=20.0 + i, current=1.0, timestamp=datetime(2026, 1, 1, 12, i)
+            ))
+        session.commit()
+
+
+def test_export_rows_filters_by_socket_and_time(db):
+    add_history(db)
+
+    rows = list(export_rows("history", [1], since=datetime(2026, 1, 1, 12, 1), chunk_rows=1))
+
+    assert [(row[1], row[2]) for row in rows] == [(1, datetime(2026, 1, 1, 12, 2))]
+    assert len(list(export_rows("history", until=datetime(2026, 1, 1, 12, 2)))) == 2
+
+
+def test_parse_time_converts_offsets_to_naive_local_time():
+    aware = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    assert parse_time("2026-01-01T12:00:00Z") == aware.astimezone().replace(tzinfo=None)
+    assert parse_time("2026-01-01T12:00") == datetime(2026, 1, 1, 12, 0)
+    assert parse_time("") is None
+
+
+def test_export_endpoint_streams_csv_and_rejects_bad_parameters(db):
+    add_history(db)
+    client = TestClient(api)
+
+    response = client.get("/export/history", params={"socket": "2", "since": "2026-01-01T12:00"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "id,socket_id,timestamp,temperature,current"
+    assert [line.split(",")[2] for line in lines[1:]] == ["2026-01-01T12:01:00", "2026-01-01T12:03:00"]
+
+    assert client.get("/export/history", params={"since": "yesterday"}).status_code == 400
+    assert client.get("/export/nothing").status_code == 404
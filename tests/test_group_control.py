@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+import sqlmodel
+
+from project_alisto.group_control import (
+    BulkCommandProgress,
+    PublishPacer,
+    execute_bulk_command,
+    log_manual_shutdowns,
+    main,
+    plan_bulk_command,
+)
+from project_alisto.models import SocketData, ThermalEvent
+
+
+def test_plan_skips_sockets_already_in_target_state():
+    sockets = {
+        1: SocketData(socket_id=1, is_on=True),
+        2: SocketData(socket_id=2, is_on=False),
+        3: SocketData(socket_id=3, is_on=False, is_cooling=True),
+    }
+
+    assert plan_bulk_command(sockets, [1, 2, 3, 4], "off") == ([1, 4], [2, 3])
+    assert plan_bulk_command(sockets, [1, 2, 3, 4], "on") == ([2, 4], [1, 3])
+
+
+def test_execute_paces_and_staggers_turn_ons():
+    sent = []
+
+    def publish(topic, payload):
+        sent.append((time.monotonic(), topic, payload))
+        return True
+
+    progress = BulkCommandProgress(group="zone-a", command="on", total=3)
+    asyncio.run(execute_bulk_command(
+        progress, [1, 2, 3], publish, pacer=PublishPacer(rate=1000), stagger_seconds=0.05
+    ))
+
+    assert progress.sent == 3
+    assert progress.running is False
+    assert [topic for _, topic, _ in sent] == [
+        "alisto/socket/1/control", "alisto/socket/2/control", "alisto/socket/3/control"
+    ]
+    assert sent[2][0] - sent[0][0] >= 0.09
+
+
+def test_pacer_rejects_non_positive_rates():
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            PublishPacer(rate=rate)
+    with pytest.raises(SystemExit):
+        main(["run", "zone-a", "off", "--rate", "0"])
+
+
+def test_bulk_off_logs_a_manual_shutdown_per_socket_sent(db):
+    sent = []
+    progress = BulkCommandProgress(group="zone-a", command="off", total=3)
+    asyncio.run(execute_bulk_command(
+        progress, [1, 2, 3], lambda topic, payload: topic != "alisto/socket/2/control",
+        pacer=PublishPacer(rate=1000), on_sent=sent.append,
+    ))
+    log_manual_shutdowns(sent, "zone-a")
+
+    assert (progress.sent, progress.failed) == (2, 1)
+    with sqlmodel.Session(db) as session:
+        events = session.exec(sqlmodel.select(ThermalEvent).order_by(ThermalEvent.socket_id)).all()
+    assert [(event.socket_id, event.event_type) for event in events] == [
+        (1, "MANUAL_SHUTDOWN"), (3, "MANUAL_SHUTDOWN")
+    ]
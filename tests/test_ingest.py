@@ -0,0 +1,71 @@
+import reflex as rx
+import sqlmodel
+
+from project_alisto.ingest import IngestPipeline
+from project_alisto.models import SocketDataHistory, SocketState, ThermalEvent
+
+SHUTDOWN = {"status": "THERMAL_SHUTDOWN", "cooling_until": 2000.0, "timestamp": 1000.0}
+
+
+def stored_state(engine, socket_id):
+    with sqlmodel.Session(engine) as session:
+        return session.exec(sqlmodel.select(SocketState).where(SocketState.socket_id == socket_id)).one()
+
+
+def test_only_the_owning_shard_handles_a_socket(db):
+    owner, other = IngestPipeline([1, 3]), IngestPipeline([2, 4])
+
+    for pipeline in (owner, other):
+        pipeline.handle_mqtt_message("alisto/socket/1/data", {"temperature": 40.0, "is_on": True})
+        pipeline.handle_mqtt_message("alisto/socket/1/status", SHUTDOWN)
+        pipeline.handle_mqtt_message("alisto/socket/1/data", {"temperature": 45.0})
+    for pipeline in (owner, other):
+        pipeline.flush()
+        pipeline.events.flush()
+
+    state = stored_state(db, 1)
+    assert (state.temperature, state.is_cooling, state.cooling_until) == (45.0, True, 2000.0)
+    with sqlmodel.Session(db) as session:
+        assert len(session.exec(sqlmodel.select(ThermalEvent)).all()) == 1
+
+
+def test_stale_writer_only_updates_what_it_changed(db):
+    first, overlapping = IngestPipeline([1]), IngestPipeline([1])
+    first.handle_mqtt_message("alisto/socket/1/status", SHUTDOWN)
+    first.flush()
+
+    # The overlapping pipeline's copy still says "not cooling"
+    overlapping.handle_mqtt_message("alisto/socket/1/data", {"temperature": 55.0, "current": 2.0})
+    overlapping.flush()
+
+    state = stored_state(db, 1)
+    assert (state.temperature, state.current) == (55.0, 2.0)
+    assert state.is_cooling is True
+    assert state.cooling_until == 2000.0
+
+
+def test_failed_write_is_retried_with_the_next_batch(db, monkeypatch):
+    pipeline = IngestPipeline([1])
+    pipeline.handle_mqtt_message("alisto/socket/1/status", SHUTDOWN)
+    working_session = rx.session
+    monkeypatch.setattr(rx, "session", lambda: (_ for _ in ()).throw(RuntimeError("database is locked")))
+    assert pipeline.flush() is False
+
+    monkeypatch.setattr(rx, "session", working_session)
+    pipeline.handle_mqtt_message("alisto/socket/1/data", {"temperature": 30.0})
+    assert pipeline.flush() is True
+
+    state = stored_state(db, 1)
+    assert (state.is_cooling, state.cooling_until, state.temperature) == (True, 2000.0, 30.0)
+
+
+def test_run_writes_queued_messages_in_batches(db):
+    pipeline = IngestPipeline([1, 2], batch_size=3, batch_seconds=60)
+    for reading in range(7):
+        pipeline.submit(f"alisto/socket/{1 + reading % 2}/data", {"temperature": float(reading)})
+    pipeline.start()
+    pipeline.stop()
+
+    with sqlmodel.Session(db) as session:
+        assert len(session.exec(sqlmodel.select(SocketDataHistory)).all()) == 7
+    assert (stored_state(db, 1).temperature, stored_state(db, 2).temperature) == (6.0, 5.0)
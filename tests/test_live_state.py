@@ -0,0 +1,111 @@
+import threading
+
+from project_alisto import live_state
+from project_alisto.live_state import LiveStateCache
+from project_alisto.group_control import save_group
+from project_alisto.models import ThermalLimits
+from project_alisto.thermal_rules import save_limit_profile
+
+
+def test_snapshot_contains_every_socket():
+    cache = LiveStateCache(num_sockets=3)
+
+    version, sockets, events = cache.snapshot()
+
+    assert sorted(sockets) == [1, 2, 3]
+    assert events == []
+
+
+def test_messages_update_state_and_bump_version():
+    cache = LiveStateCache(num_sockets=2)
+    version, before, _ = cache.snapshot()
+
+    cache.apply_message("alisto/socket/2/data", {"temperature": 41.5, "is_on": True})
+    cache.apply_message("alisto/socket/9/data", {"temperature": 99.0})
+    new_version, after, _ = cache.snapshot()
+
+    assert new_version == version + 1
+    assert after[2].temperature == 41.5
+    assert after[2].is_on is True
+    # Snapshots taken earlier are not mutated
+    assert before[2].temperature == 0.0
+
+
+def test_unchanged_state_keeps_version():
+    cache = LiveStateCache(num_sockets=1)
+    cache.apply_message("alisto/socket/1/status", {"status": "NORMAL"})
+
+    assert cache.version == 0
+
+
+def test_trend_averages_readings_into_closed_buckets(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(live_state.time, "time", lambda: clock[0])
+    cache = LiveStateCache(num_sockets=1, bucket_seconds=15.0)
+    for reading in range(30):
+        clock[0] = 1000.0 + reading
+        cache.apply_message("alisto/socket/1/data", {"temperature": 10.0 + reading})
+
+    points = cache.trend_since(1, 0.0)
+
+    # 990-1005 and 1005-1020 are closed; 1020-1035 is still open
+    assert [point["ts"] for point in points] == [997.5, 1012.5]
+    assert [point["temperature"] for point in points] == [12.0, 22.0]
+    assert cache.trend_since(1, points[-1]["ts"]) == []
+
+    clock[0] = 1035.0
+    assert cache.trend_since(1, points[-1]["ts"])[0]["temperature"] == 34.5
+
+
+def test_trend_keeps_a_fixed_number_of_buckets(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(live_state.time, "time", lambda: clock[0])
+    cache = LiveStateCache(num_sockets=1, bucket_seconds=1.0)
+    for reading in range(200):
+        clock[0] = float(reading)
+        cache.apply_message("alisto/socket/1/data", {"temperature": float(reading)})
+
+    points = cache.trend_since(1, 0.0)
+
+    assert len(points) == 120
+    assert points[-1]["temperature"] == 198.0
+
+
+def test_status_colors_follow_readings_and_limits():
+    cache = LiveStateCache(num_sockets=2)
+    cache.apply_message("alisto/socket/1/data", {"temperature": 45.0, "is_on": True})
+    _, sockets, _ = cache.snapshot()
+    assert sockets[1].status_color == "yellow"
+    assert sockets[2].status_color == "gray"
+
+    version = cache.version
+    cache.update_limits({1: ThermalLimits(max_temperature=48.0, max_current=15.0)})
+    new_version, sockets, _ = cache.snapshot()
+
+    assert new_version == version + 1
+    assert sockets[1].status_color == "red"
+    assert cache.limits()[1].max_temperature == 48.0
+
+
+def test_start_seeds_off_the_calling_thread(monkeypatch):
+    cache = LiveStateCache(num_sockets=1)
+    release = threading.Event()
+    monkeypatch.setattr(cache, "seed", release.wait)
+
+    cache.start()
+
+    assert not release.is_set()
+    release.set()
+    cache.stop()
+
+
+def test_seed_loads_groups_and_their_limits(db):
+    save_group("zone-a", [2])
+    save_limit_profile(max_temperature=40.0, max_current=5.0, group_id=1)
+    cache = LiveStateCache(num_sockets=2)
+
+    cache.seed_from_store()
+
+    assert cache.groups() == [{"id": 1, "name": "zone-a", "socket_ids": [2], "size": 1}]
+    assert cache.limits()[2].max_temperature == 40.0
+    assert cache.limits()[1].max_temperature != 40.0
@@ -1,5 +1,5 @@
 # --- In tests/test_logic.py ---
-from project_alisto.logic import handle_socket_status
+from project_alisto.logic import handle_socket_status, parse_socket_topic
 from project_alisto.models import SocketData
 import time
 
@@ -20,4 +20,9 @@ def test_handle_thermal_shutdown():
     assert updated_socket.is_cooling is True
     assert updated_socket.cooling_until == shutdown_msg["cooling_until"]
     assert new_event is not None
-    assert new_event.event_type == "THERMAL_SHUTDOWN"
\ No newline at end of file
+    assert new_event.event_type == "THERMAL_SHUTDOWN"
+
+def test_parse_socket_topic():
+    assert parse_socket_topic("alisto/socket/12/data") == (12, "data")
+    assert parse_socket_topic("alisto/socket/3/status") == (3, "status")
+    assert parse_socket_topic("alisto/other/topic") is None
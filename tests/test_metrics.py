@@ -0,0 +1,83 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from project_alisto.metrics import Counter, Gauge, Histogram, MetricsRegistry, start_http_server, topic_type
+
+
+def test_counter_renders_labelled_samples():
+    counter = Counter("test_messages_total", "Messages.", ("topic_type",))
+    counter.inc(topic_type="data")
+    counter.inc(2, topic_type="data")
+    counter.inc(topic_type="status")
+
+    text = counter.render()
+
+    assert "# TYPE test_messages_total counter" in text
+    assert 'test_messages_total{topic_type="data"} 3' in text
+    assert 'test_messages_total{topic_type="status"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    text = histogram.render()
+
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_latency_seconds_count 3" in text
+
+
+def test_registry_renders_gauge_function():
+    registry = MetricsRegistry()
+    gauge = registry.register(Gauge("test_sessions", "Sessions."))
+    gauge.set_function(lambda: 7)
+
+    assert "test_sessions 7" in registry.render()
+
+
+def test_topic_type():
+    assert topic_type("alisto/socket/3/data") == "data"
+    assert topic_type("alisto/socket/3/status") == "status"
+
+
+def test_dashboard_does_not_export_ingest_metrics():
+    from project_alisto.metrics import DASHBOARD_REGISTRY, INGEST_REGISTRY, REGISTRY, render
+
+    dashboard = render(REGISTRY, DASHBOARD_REGISTRY)
+    worker = render(REGISTRY, INGEST_REGISTRY)
+
+    assert "alisto_message_queue_depth" not in dashboard
+    assert "alisto_active_sessions" in dashboard
+    assert "alisto_message_queue_depth" in worker
+    assert "alisto_active_sessions" not in worker
+    assert "alisto_db_commit_duration_seconds" in dashboard and "alisto_db_commit_duration_seconds" in worker
+
+
+def test_http_server_serves_post_routes():
+    calls = []
+
+    def route(authorization, query):
+        calls.append((authorization, query))
+        return 202, {"started": True}
+
+    server = start_http_server(0, "127.0.0.1", registries=(), post_routes={"/profile": route})
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(
+            f"{url}/profile?seconds=5", method="POST", headers={"Authorization": "Bearer x"}
+        )
+        with urllib.request.urlopen(request) as response:
+            assert (response.status, json.load(response)) == (202, {"started": True})
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(urllib.request.Request(f"{url}/other", method="POST"))
+    finally:
+        server.shutdown()
+
+    assert calls == [("Bearer x", {"seconds": "5"})]
@@ -0,0 +1,68 @@
+from project_alisto.notifications import (
+    CLIENT_HANDLER,
+    Alert,
+    NotificationDispatcher,
+    build_notification,
+    stamp_notification,
+)
+
+
+def test_alerts_in_one_window_become_one_notification():
+    dispatcher = NotificationDispatcher(window_seconds=2.0, min_interval_seconds=10.0)
+    for socket_id in (3, 1, 2, 5, 4):
+        dispatcher.add("THERMAL_SHUTDOWN", socket_id, now=100.0)
+
+    assert dispatcher.flush(now=101.0) is None
+    payload = dispatcher.flush(now=102.0)
+
+    assert payload["title"] == "5 sockets shut down"
+    assert payload["alerts"] == {"THERMAL_SHUTDOWN": [1, 2, 3, 4, 5]}
+    assert dispatcher.flush(now=103.0) is None
+
+
+def test_notifications_are_rate_limited():
+    dispatcher = NotificationDispatcher(window_seconds=0.0, min_interval_seconds=10.0)
+    dispatcher.add("THERMAL_SHUTDOWN", 1, now=0.0)
+    assert dispatcher.flush(now=0.0) is not None
+
+    dispatcher.add("THERMAL_SHUTDOWN", 2, now=1.0)
+    dispatcher.add("MANUAL_SHUTDOWN", 3, now=2.0)
+
+    assert dispatcher.flush(now=5.0) is None
+    assert dispatcher.flush(now=10.0)["title"] == "2 socket alerts"
+
+
+def test_single_alert_title():
+    payload = build_notification([Alert(kind="THERMAL_SHUTDOWN", socket_id=7)])
+
+    assert payload["title"] == "Socket 7 shut down"
+    assert payload["count"] == 1
+
+
+def test_stamped_notifications_get_increasing_sequence_numbers():
+    first = stamp_notification({"title": "Socket 1 shut down"})
+    second = stamp_notification({"title": "Socket 2 shut down"}, first["seq"])
+
+    assert (first["seq"], second["seq"]) == (1, 2)
+    assert second["title"] == "Socket 2 shut down"
+
+
+def test_listener_passes_state_to_the_preinstalled_handler():
+    from project_alisto.components.notification_listener import notification_listener
+
+    hooks = [hook for hook in notification_listener()._get_all_hooks() if "useEffect" in hook]
+
+    assert len(hooks) == 1
+    assert f"{CLIENT_HANDLER}(" in hooks[0]
+    assert ".notification_rx_state_?.seq]" in hooks[0]
+
+
+def test_listener_skips_the_sequence_number_present_on_hydration():
+    from project_alisto.components.notification_listener import notification_listener
+
+    hooks = [str(hook) for hook in notification_listener()._get_all_hooks()]
+    effect = next(hook for hook in hooks if "useEffect" in hook)
+
+    assert "const alistoSeenSeq = useRef(null)" in hooks
+    assert "is_hydrated_rx_state_" in effect
+    assert "sent_at" not in effect and "Date.now" not in effect
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from starlette.testclient import TestClient
+
+from project_alisto import diagnostics, project_alisto
+from project_alisto.live_state import LiveStateCache
+from project_alisto.metrics import ACTIVE_SESSIONS
+from project_alisto.project_alisto import State, index, socket_detail
+
+
+def test_pages_render():
+    # Building the component tree resolves every State/var reference
+    for page in (index, socket_detail):
+        assert page().render()
+
+
+def test_hydration_copies_only_what_changed(monkeypatch):
+    cache = LiveStateCache(num_sockets=2)
+    monkeypatch.setattr(project_alisto, "LIVE_STATE", cache)
+    state = State(_reflex_internal_init=True)
+    state._hydrate_from_live_state()
+    state.dirty_vars.clear()
+
+    state._hydrate_from_live_state()
+    assert "sockets" not in state.dirty_vars
+
+    cache.apply_message("alisto/socket/2/data", {"temperature": 41.5})
+    state._hydrate_from_live_state()
+    assert "sockets" in state.dirty_vars
+    assert "thermal_events" not in state.dirty_vars
+    assert state.sockets[2].temperature == 41.5
+
+
+def test_active_sessions_counts_connected_clients(monkeypatch):
+    assert ACTIVE_SESSIONS.value() == 0
+
+    namespace = SimpleNamespace(token_to_sid={"tab-1": "sid-1", "tab-2": "sid-2"})
+    monkeypatch.setattr(project_alisto.app, "_event_namespace", namespace)
+
+    assert ACTIVE_SESSIONS.value() == 2
+
+
+def test_admin_profile_rejects_unbounded_windows(monkeypatch):
+    monkeypatch.setattr(diagnostics, "ADMIN_TOKEN", "secret")
+    client = TestClient(project_alisto.api)
+
+    response = client.post("/admin/profile?seconds=inf", headers={"Authorization": "Bearer secret"})
+
+    assert response.status_code == 400
+    assert not diagnostics.PROFILER.active
@@ -0,0 +1,43 @@
+import sqlmodel
+
+from project_alisto.models import SocketData, SocketState, SocketStateVersion
+from project_alisto.store import load_socket_states, next_state_version, save_socket_state
+
+
+def save(engine, socket, fields=None):
+    with sqlmodel.Session(engine) as session:
+        save_socket_state(session, socket, fields)
+        session.commit()
+
+
+def test_states_are_polled_by_version(db):
+    save(db, SocketData(socket_id=1, temperature=30.0))
+    save(db, SocketData(socket_id=2, temperature=31.0))
+    states, version = load_socket_states()
+    assert sorted(states) == [1, 2]
+
+    save(db, SocketData(socket_id=1, temperature=35.0), ["temperature"])
+    changed, newer = load_socket_states(version)
+
+    assert list(changed) == [1]
+    assert changed[1].temperature == 35.0
+    assert newer > version
+    assert load_socket_states(newer) == ({}, newer)
+
+
+def test_versions_continue_above_rows_written_before_the_counter(db):
+    with sqlmodel.Session(db) as session:
+        session.add(SocketState(socket_id=3, version=41))
+        session.commit()
+
+    save(db, SocketData(socket_id=1, temperature=30.0))
+    with sqlmodel.Session(db) as session:
+        version = next_state_version(session)
+        save_socket_state(session, SocketData(socket_id=1, temperature=31.0), ["temperature"], version)
+        save_socket_state(session, SocketData(socket_id=2, temperature=32.0), version=version)
+        session.commit()
+
+    states, newest = load_socket_states(41)
+    assert (sorted(states), newest) == ([1, 2], 43)
+    with sqlmodel.Session(db) as session:
+        assert session.exec(sqlmodel.select(SocketStateVersion.version)).one() == 43
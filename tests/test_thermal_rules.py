@@ -0,0 +1,65 @@
+import pytest
+import sqlmodel
+
+from project_alisto.models import SocketData, ThermalLimitProfile, ThermalLimits
+from project_alisto.thermal_rules import ThermalRuleEvaluator, main, resolve_limits, save_limit_profile
+
+
+def test_socket_profile_overrides_tightest_group_profile():
+    profiles = [
+        ThermalLimitProfile(group_id=1, max_temperature=50.0, max_current=12.0),
+        ThermalLimitProfile(group_id=2, max_temperature=55.0, max_current=10.0),
+        ThermalLimitProfile(socket_id=3, max_temperature=40.0, max_current=8.0),
+    ]
+
+    limits = resolve_limits([1, 2, 3], profiles, {1: [1, 3], 2: [1]})
+
+    assert limits[1] == ThermalLimits(50.0, 10.0)
+    assert limits[2] == ThermalLimits(60.0, 15.0)
+    assert limits[3] == ThermalLimits(40.0, 8.0)
+
+
+def test_colors_use_per_socket_limits():
+    evaluator = ThermalRuleEvaluator([1, 2, 3, 4])
+    evaluator.set_limits({2: ThermalLimits(max_temperature=40.0, max_current=15.0)})
+    sockets = {
+        1: SocketData(socket_id=1, temperature=37.0, is_on=True),
+        2: SocketData(socket_id=2, temperature=37.0, is_on=True),
+        3: SocketData(socket_id=3, temperature=70.0, is_on=True, is_cooling=True),
+        4: SocketData(socket_id=4, current=14.0),
+    }
+
+    assert evaluator.evaluate(sockets) == {1: "green", 2: "red", 3: "orange", 4: "gray"}
+
+
+def test_hysteresis_holds_level_near_threshold():
+    evaluator = ThermalRuleEvaluator([1])
+
+    def color(temperature):
+        return evaluator.evaluate({1: SocketData(socket_id=1, temperature=temperature, is_on=True)})[1]
+
+    # Warning starts at 42°C (0.7 x 60) and ends below 39°C (0.65 x 60)
+    assert color(41.9) == "green"
+    assert color(42.0) == "yellow"
+    assert color(40.0) == "yellow"
+    assert color(38.9) == "green"
+    assert color(54.0) == "red"
+    assert color(52.0) == "red"
+    assert color(50.0) == "yellow"
+
+
+@pytest.mark.parametrize("max_temperature, max_current", [(0.0, 10.0), (50.0, -1.0), (float("nan"), 10.0)])
+def test_non_positive_limits_are_rejected(db, max_temperature, max_current):
+    with pytest.raises(ValueError):
+        save_limit_profile(max_temperature, max_current, socket_id=3)
+
+    with sqlmodel.Session(db) as session:
+        assert session.exec(sqlmodel.select(ThermalLimitProfile)).all() == []
+
+
+@pytest.mark.parametrize("limit", ["0", "-5", "inf"])
+def test_cli_rejects_non_positive_limits(db, limit):
+    with pytest.raises(SystemExit) as exc_info:
+        main(["set", "--socket", "3", "--max-current", limit])
+
+    assert exc_info.value.code == 2
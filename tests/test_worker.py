@@ -0,0 +1,120 @@
+import argparse
+import signal
+import subprocess
+import sys
+import threading
+
+import sqlmodel
+
+from project_alisto import worker
+from project_alisto.models import SocketDataHistory
+
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = 0
+
+    def connect(self):
+        self.attempts += 1
+        return self.attempts > self.failures
+
+
+def test_connect_retries_until_the_broker_is_up():
+    delays = []
+
+    class Stop(threading.Event):
+        def wait(self, timeout=None):
+            delays.append(timeout)
+            return False
+
+    client = FlakyClient(failures=4)
+
+    assert worker.connect_with_retry(client, Stop(), max_delay=5.0) is True
+    assert client.attempts == 5
+    assert delays == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_connect_retry_gives_up_when_stopped():
+    stop = threading.Event()
+    stop.set()
+
+    assert worker.connect_with_retry(FlakyClient(failures=100), stop) is False
+
+
+def test_socket_shard_assigns_each_socket_to_one_shard():
+    shard_count = 3
+    owners = {socket_id: worker.socket_shard(socket_id, shard_count) for socket_id in range(1, 100)}
+
+    assert set(owners.values()) == {0, 1, 2}
+    assert all(worker.socket_shard(socket_id, shard_count) == owner for socket_id, owner in owners.items())
+
+
+def test_shards_partition_sockets(monkeypatch):
+    monkeypatch.setattr(worker, "NUM_SOCKETS", 7)
+
+    shards = [worker.shard_socket_ids(index, 3) for index in range(3)]
+
+    assert shards == [[3, 6], [1, 4, 7], [2, 5]]
+    assert sorted(sum(shards, [])) == list(range(1, 8))
+
+
+def test_shard_subscribes_to_data_and_status_of_its_sockets(monkeypatch):
+    monkeypatch.setattr(worker, "NUM_SOCKETS", 4)
+
+    assert worker.subscription_topics(0, 1) == ["alisto/socket/+/data", "alisto/socket/+/status"]
+    assert worker.subscription_topics(1, 2) == [
+        "alisto/socket/1/data", "alisto/socket/1/status",
+        "alisto/socket/3/data", "alisto/socket/3/status",
+    ]
+
+
+def test_shard_parent_forwards_signals_to_every_shard(monkeypatch):
+    handlers = {}
+    processes = []
+
+    class FakeProcess:
+        def __init__(self, command):
+            self.signals = []
+            processes.append(self)
+
+        def send_signal(self, signum):
+            self.signals.append(signum)
+
+        def wait(self):
+            if self is processes[0]:
+                handlers[signal.SIGUSR1](signal.SIGUSR1, None)
+                handlers[signal.SIGINT](signal.SIGINT, None)
+            return 0
+
+    monkeypatch.setattr(worker.signal, "signal", lambda signum, handler: handlers.__setitem__(signum, handler))
+    monkeypatch.setattr(worker.subprocess, "Popen", FakeProcess)
+    args = argparse.Namespace(
+        shards=2, metrics_port=0, replay=None, speed=1.0, max_speed=False, profile=0
+    )
+
+    assert worker.run_shards(args) == 0
+    assert [process.signals for process in processes] == [[signal.SIGUSR1, signal.SIGTERM]] * 2
+
+
+def test_messages_received_while_the_pipeline_loads_are_handled_in_order(db):
+    loader = worker.PipelineLoader([1])
+    loader.submit("alisto/socket/1/data", {"temperature": 40.0})
+    loader.submit("alisto/socket/1/data", {"temperature": 45.0})
+
+    pipeline = loader.load()
+    loader.submit("alisto/socket/1/data", {"temperature": 50.0, "current": 2.0})
+    pipeline.stop()
+
+    with sqlmodel.Session(db) as session:
+        rows = session.exec(sqlmodel.select(SocketDataHistory).order_by(SocketDataHistory.id)).all()
+    assert [row.temperature for row in rows] == [40.0, 45.0, 50.0]
+    assert loader.wait() is pipeline
+
+
+def test_worker_module_does_not_import_the_tables():
+    code = "import sys, project_alisto.worker; print('project_alisto.models' in sys.modules)"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"